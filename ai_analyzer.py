@@ -1,71 +1,442 @@
-import time
+import asyncio
+import concurrent.futures
 import random
-import traceback
-import json
+import threading
+import time
 import os
-from dotenv import load_dotenv
-import google.generativeai as genai
-from config import ANALYSIS_PROMPT, DEFAULT_ANALYSIS
+from typing import Dict, List, Optional, Tuple
+from config import (load_env, ANALYSIS_PROMPT, BATCH_ANALYSIS_PROMPT, DEFAULT_ANALYSIS, GEMINI_MODEL,
+                    MAX_BATCH_SIZE, BATCH_TOKEN_BUDGET, ANALYSIS_CACHE_ENABLED, ASYNC_MAX_IN_FLIGHT,
+                    STRUCTURED_OUTPUT, PROMPT_COMPRESSION, POST_TOKEN_BUDGET, RETRY_BACKOFF)
+from analysis_cache import AnalysisCache
+from metrics import get_metrics
+from prompt_compression import compress_post, estimate_tokens
+from rate_limiter import AdaptiveRateLimiter, get_shared_limiter, is_throttle_error
+from structured_output import ANALYSIS_SCHEMA, BATCH_ANALYSIS_SCHEMA, coerce_analysis, decode_response
+
+metrics = get_metrics()
+
 
 class AIAnalyzer:
-    def __init__(self):
-        load_dotenv()
+    def __init__(self, cache: Optional[AnalysisCache] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, model=None):
+        # Build the model client once and reuse it for every request. An injected
+        # model (e.g. replay.ReplayModel) needs no API key
+        self.model = model if model is not None else self._build_model()
+
+        # Ask Gemini for schema-constrained JSON rather than free text
+        if STRUCTURED_OUTPUT:
+            self.analysis_config = {"response_mime_type": "application/json", "response_schema": ANALYSIS_SCHEMA}
+            self.batch_config = {"response_mime_type": "application/json", "response_schema": BATCH_ANALYSIS_SCHEMA}
+        else:
+            self.analysis_config = self.batch_config = None
+
+        # Request outcome counters, see stats()
+        self.counters = {"api_calls": 0, "api_failures": 0, "parsed": 0, "parse_failures": 0,
+                         "prompt_tokens": 0, "prompt_tokens_saved": 0}
+        self._counters_lock = threading.Lock()
+        
+        # Rate limiting parameters, the limiter is shared by every analyzer in the process
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        self.max_retries = 3
+        self.retry_backoff = RETRY_BACKOFF
+
+        # Batching parameters
+        self.max_batch_size = MAX_BATCH_SIZE
+        self.batch_token_budget = BATCH_TOKEN_BUDGET
+
+        # Post text is compressed to this many estimated tokens before prompting, None to send it as is
+        self.post_token_budget = POST_TOKEN_BUDGET if PROMPT_COMPRESSION else None
+
+        # Persistent analysis cache, shared by analyze_post and analyze_batch
+        if cache is None and ANALYSIS_CACHE_ENABLED:
+            cache = AnalysisCache()
+        self.cache = cache
+
+    def _build_model(self):
+        """Gemini client for GEMINI_MODEL, using GEMINI_API_KEY from the environment"""
+        load_env()
         api_key = os.getenv('GEMINI_API_KEY')
         if not api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
+        # Imported here, the Gemini SDK takes most of a second to load
+        import google.generativeai as genai
         genai.configure(api_key=api_key)
-        
-        # Rate limiting parameters
-        self.last_request_time = 0
-        self.min_request_interval = 1  # Minimum seconds between requests
-        self.max_retries = 3
-        self.retry_delay = 2  # Base delay in seconds
+        return genai.GenerativeModel(GEMINI_MODEL)
 
-    def _wait_for_rate_limit(self):
+    def _wait_for_rate_limit(self, tokens: int = 1):
         """Wait if necessary to respect rate limits"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last_request)
-        self.last_request_time = time.time()
+        with metrics.timer("analyzer.wait"):
+            self.rate_limiter.acquire(tokens)
 
-    def analyze_post(self, post_text: str) -> dict:
-        """Analyze a LinkedIn post using AI"""
-        if not post_text or not post_text.strip():
-            return DEFAULT_ANALYSIS
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Seconds to wait before retrying after error.
+
+        Throttling errors are paced by the shared limiter instead; other errors
+        back off exponentially with jitter so an outage does not get a burst
+        of retries from every worker at once.
+        """
+        if is_throttle_error(error):
+            return 0.0
+        return self.retry_backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._counters_lock:
+            self.counters[counter] += amount
+
+    def stats(self) -> Dict:
+        """Request outcome counters.
+
+        api_failures counts attempts that raised or came back empty,
+        parse_failures counts responses that arrived but held no usable
+        analysis, i.e. calls that were paid for and wasted. prompt_tokens is
+        the estimated size of every prompt sent, prompt_tokens_saved what
+        prompt compression removed from the posts.
+        """
+        with self._counters_lock:
+            stats = dict(self.counters)
+        responses = stats["parsed"] + stats["parse_failures"]
+        stats["parse_failure_rate"] = stats["parse_failures"] / responses if responses else 0.0
+        stats["prompt_tokens_per_request"] = stats["prompt_tokens"] / stats["api_calls"] if stats["api_calls"] else 0.0
+        return stats
 
+    def _prepare(self, post_text: str) -> str:
+        """Compress a post for the prompt, counting the estimated tokens saved"""
+        if self.post_token_budget is None:
+            return post_text
+        compressed = compress_post(post_text, self.post_token_budget)
+        self._count("prompt_tokens_saved", max(0, estimate_tokens(post_text) - estimate_tokens(compressed)))
+        return compressed
+
+    def _generate(self, prompt: str, generation_config=None) -> Optional[str]:
+        """Send a prompt to Gemini with retries and return the response text"""
+        prompt_tokens = estimate_tokens(prompt)
         for attempt in range(self.max_retries):
             try:
-                # Prepare the prompt
-                prompt = ANALYSIS_PROMPT.format(post_text=post_text)
-                
                 # Wait for rate limit before making request
-                self._wait_for_rate_limit()
+                self._wait_for_rate_limit(prompt_tokens)
                 
                 # Use a Gemini model for the chat completions call
-                model = genai.GenerativeModel('models/gemini-1.5-flash')
-                response = model.generate_content(prompt)
+                self._count("api_calls")
+                self._count("prompt_tokens", prompt_tokens)
+                with metrics.timer("analyzer.request"):
+                    response = self.model.generate_content(prompt, generation_config=generation_config)
+                self.rate_limiter.on_success()
                 
                 if response and response.text:
-                    try:
-                        # Try to parse the response as JSON
-                        analysis = json.loads(response.text)
-                        return analysis
-                    except json.JSONDecodeError:
-                        return DEFAULT_ANALYSIS
-                else:
-                    return DEFAULT_ANALYSIS
+                    return response.text
+                self._count("api_failures")
+                return None
 
             except Exception as e:
+                self._count("api_failures")
+                if is_throttle_error(e):
+                    metrics.increment("analyzer.throttled")
+                    # Slow down every analyzer sharing the limiter instead of sleeping here
+                    self.rate_limiter.on_throttle()
                 if attempt < self.max_retries - 1:
-                    # Add exponential backoff
-                    delay = self.retry_delay * (2 ** attempt)
-                    time.sleep(delay)
+                    metrics.increment("analyzer.retries")
+                    time.sleep(self._retry_delay(e, attempt))
                     continue
-                return DEFAULT_ANALYSIS
+                return None
+
+        return None
+
+    def analyze_post(self, post_text: str) -> dict:
+        """Analyze a LinkedIn post using AI"""
+        if not post_text or not post_text.strip():
+            return DEFAULT_ANALYSIS
+
+        if self.cache is not None:
+            cached = self.cache.get(post_text)
+            if cached is not None:
+                return cached
+
+        analysis = self._request_analysis(self._prepare(post_text))
+        if self.cache is not None:
+            self.cache.set(post_text, analysis)
+        return analysis
+
+    def _request_analysis(self, post_text: str) -> dict:
+        """Send a single-post prompt and parse the response"""
+        # Prepare the prompt
+        prompt = ANALYSIS_PROMPT.format(post_text=post_text)
+        return self._parse_analysis(self._generate(prompt, self.analysis_config))
+
+    def _parse_analysis(self, response_text: Optional[str]) -> dict:
+        """Parse a single-post response, falling back to DEFAULT_ANALYSIS"""
+        if not response_text:
+            return DEFAULT_ANALYSIS
+
+        try:
+            # Tolerates code fences and loosely typed fields
+            with metrics.timer("analyzer.parse"):
+                analysis = coerce_analysis(decode_response(response_text))
+        except ValueError:
+            analysis = None
+        if analysis is None:
+            self._count("parse_failures")
+            return DEFAULT_ANALYSIS
+        self._count("parsed")
+        return analysis
+
+    def analyze_batch(self, posts: List[str]) -> List[dict]:
+        """Analyze several LinkedIn posts with as few requests as possible.
+
+        Posts are packed into multi-post prompts within the token budget. Posts
+        missing from a partial response are retried once as a batch; after that,
+        or when nothing usable came back, they are sent one at a time, so a
+        batch of N posts never costs more than N + 1 requests.
+        Returns one analysis per post, in input order.
+        """
+        results, pending, prepared = self._start_batch(posts)
+        for batch in self._pack_batches(prepared, pending):
+            self._analyze_packed(prepared, batch, results)
+        self._finish_batch(posts, pending, results)
+        return results
+
+    def _start_batch(self, posts: List[str]) -> Tuple[List[Optional[dict]], List[int], List[str]]:
+        """Results answered without a request, the indices still to send and the prompt-ready posts"""
+        results: List[Optional[dict]] = [None] * len(posts)
+        pending = []
+        for i, post_text in enumerate(posts):
+            if not post_text or not post_text.strip():
+                results[i] = DEFAULT_ANALYSIS
+            elif self.cache is not None and (cached := self.cache.get(post_text)) is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        # Compressed copies of the posts go into the prompts, the cache stays keyed on the originals
+        prepared = list(posts)
+        for i in pending:
+            prepared[i] = self._prepare(posts[i])
+        return results, pending, prepared
+
+    def _finish_batch(self, posts: List[str], pending: List[int], results: List[Optional[dict]]):
+        if self.cache is not None:
+            for i in pending:
+                self.cache.set(posts[i], results[i])
+
+    def _pack_batches(self, posts: List[str], indices: List[int]) -> List[List[int]]:
+        """Group post indices into batches that fit the prompt token budget"""
+        overhead = estimate_tokens(BATCH_ANALYSIS_PROMPT)
+        batches = []
+        current, used = [], overhead
+        for i in indices:
+            cost = estimate_tokens(posts[i]) + 5  # "[Post N]" header and separator
+            if current and (used + cost > self.batch_token_budget or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, used = [], overhead
+            current.append(i)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _analyze_packed(self, posts: List[str], indices: List[int], results: List[Optional[dict]],
+                        retried: bool = False):
+        """Analyze one packed batch, retrying only the posts the response missed"""
+        if len(indices) == 1:
+            results[indices[0]] = self._request_analysis(posts[indices[0]])
+            return
 
-        return DEFAULT_ANALYSIS
+        response_text = self._generate(self._batch_prompt(posts, indices), self.batch_config)
+        for retry in self._apply_batch_response(response_text, indices, results, retried):
+            self._analyze_packed(posts, retry, results, retried=True)
+
+    def _batch_prompt(self, posts: List[str], indices: List[int]) -> str:
+        return BATCH_ANALYSIS_PROMPT.format(
+            posts="\n\n".join(f"[Post {n}]\n{posts[i]}" for n, i in enumerate(indices))
+        )
+
+    def _apply_batch_response(self, response_text: Optional[str], indices: List[int],
+                              results: List[Optional[dict]], retried: bool = False) -> List[List[int]]:
+        """Store a batched response's analyses, returns the index groups still to analyze"""
+        if not response_text:
+            # The request failed after every retry; splitting would only multiply failing requests
+            for i in indices:
+                results[i] = DEFAULT_ANALYSIS
+            return []
+
+        parsed = self._parse_batch_response(response_text, len(indices))
+        missing = []
+        for n, i in enumerate(indices):
+            if n in parsed:
+                results[i] = parsed[n]
+            else:
+                missing.append(i)
+
+        if not missing:
+            return []
+        if retried or len(missing) == len(indices):
+            # Nothing usable came back, or a retry came back short again: halving the batch
+            # repeatedly costs about 2N requests, one request per post costs N
+            return [[i] for i in missing]
+        return [missing]
+
+    def _parse_batch_response(self, response_text: str, count: int) -> Dict[int, dict]:
+        """Map post index to analysis for every well-formed entry of a batched response"""
+        with metrics.timer("analyzer.parse"):
+            try:
+                entries = decode_response(response_text)
+            except ValueError:
+                entries = None
+            if not isinstance(entries, list):
+                self._count("parse_failures")
+                return {}
+
+            parsed = {}
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    continue
+                index = entry.pop("index", None)
+                analysis = coerce_analysis(entry)
+                if isinstance(index, int) and 0 <= index < count and analysis is not None:
+                    parsed[index] = analysis
+        self._count("parsed" if parsed else "parse_failures")
+        return parsed
 
     def enrich_analysis(self, analysis: dict) -> dict:
         """Add additional insights or process the analysis if needed"""
-        return analysis
\ No newline at end of file
+        return analysis
+
+
+class AsyncAIAnalyzer(AIAnalyzer):
+    """AIAnalyzer that sends requests through Gemini's async API.
+
+    All requests run on one event loop owned by the analyzer, with at most
+    max_in_flight outstanding at a time, so many posts can be analyzed
+    concurrently without a thread per request. analyze_many and
+    analyze_batch_async are the native async API, and submit() schedules
+    such a coroutine from synchronous code (PostPipeline does this for its
+    analysis batches); analyze_post and analyze_batch remain available as
+    thin synchronous wrappers.
+    """
+
+    def __init__(self, cache: Optional[AnalysisCache] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 max_in_flight: int = ASYNC_MAX_IN_FLIGHT, model=None):
+        super().__init__(cache, rate_limiter, model)
+        self.max_in_flight = max_in_flight
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="gemini-async", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the analyzer's event loop"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def submit(self, coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the analyzer's loop from any thread, without waiting for it"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def _run(self, coroutine):
+        """Run a coroutine on the analyzer's loop from any thread and wait for it"""
+        return self.submit(coroutine).result()
+
+    def _generate(self, prompt: str, generation_config=None) -> Optional[str]:
+        """Synchronous wrapper around _generate_async"""
+        return self._run(self._generate_async(prompt, generation_config))
+
+    async def _generate_async(self, prompt: str, generation_config=None) -> Optional[str]:
+        """Async counterpart of AIAnalyzer._generate"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        prompt_tokens = estimate_tokens(prompt)
+        for attempt in range(self.max_retries):
+            try:
+                # Wait for rate limit without blocking the event loop
+                wait = self.rate_limiter.reserve(prompt_tokens)
+                metrics.record("analyzer.wait", wait)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                async with self._semaphore:
+                    self._count("api_calls")
+                    self._count("prompt_tokens", prompt_tokens)
+                    with metrics.timer("analyzer.request"):
+                        response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+                self.rate_limiter.on_success()
+
+                if response and response.text:
+                    return response.text
+                self._count("api_failures")
+                return None
+
+            except Exception as e:
+                self._count("api_failures")
+                if is_throttle_error(e):
+                    metrics.increment("analyzer.throttled")
+                    self.rate_limiter.on_throttle()
+                if attempt < self.max_retries - 1:
+                    metrics.increment("analyzer.retries")
+                    await asyncio.sleep(self._retry_delay(e, attempt))
+                    continue
+                return None
+
+        return None
+
+    async def _analyze_post_async(self, post_text: str) -> dict:
+        if not post_text or not post_text.strip():
+            return DEFAULT_ANALYSIS
+
+        if self.cache is not None:
+            cached = self.cache.get(post_text)
+            if cached is not None:
+                return cached
+
+        analysis = await self._request_analysis_async(self._prepare(post_text))
+        if self.cache is not None:
+            self.cache.set(post_text, analysis)
+        return analysis
+
+    async def _request_analysis_async(self, post_text: str) -> dict:
+        prompt = ANALYSIS_PROMPT.format(post_text=post_text)
+        return self._parse_analysis(await self._generate_async(prompt, self.analysis_config))
+
+    async def analyze_batch_async(self, posts: List[str]) -> List[dict]:
+        """Async counterpart of analyze_batch, sending the packed batches concurrently.
+
+        Must run on the analyzer's loop, e.g. through submit().
+        """
+        results, pending, prepared = self._start_batch(posts)
+        await asyncio.gather(*(self._analyze_packed_async(prepared, batch, results)
+                               for batch in self._pack_batches(prepared, pending)))
+        self._finish_batch(posts, pending, results)
+        return results
+
+    async def _analyze_packed_async(self, posts: List[str], indices: List[int], results: List[Optional[dict]],
+                                    retried: bool = False):
+        if len(indices) == 1:
+            results[indices[0]] = await self._request_analysis_async(posts[indices[0]])
+            return
+
+        response_text = await self._generate_async(self._batch_prompt(posts, indices), self.batch_config)
+        retries = self._apply_batch_response(response_text, indices, results, retried)
+        await asyncio.gather(*(self._analyze_packed_async(posts, retry, results, retried=True) for retry in retries))
+
+    async def _analyze_many(self, posts: List[str], on_result) -> List[dict]:
+        async def analyze(index: int, post_text: str) -> dict:
+            analysis = await self._analyze_post_async(post_text)
+            if on_result:
+                on_result(index, analysis)
+            return analysis
+
+        return await asyncio.gather(*(analyze(i, post_text) for i, post_text in enumerate(posts)))
+
+    async def analyze_many(self, posts: List[str], on_result=None) -> List[dict]:
+        """Analyze posts concurrently and return analyses in input order.
+
+        on_result(index, analysis) is called as each post finishes. Safe to await
+        from any event loop; the requests themselves run on the analyzer's loop.
+        """
+        return await asyncio.wrap_future(self.submit(self._analyze_many(posts, on_result)))
+
+    def analyze_many_sync(self, posts: List[str], on_result=None) -> List[dict]:
+        """Blocking wrapper around analyze_many"""
+        return self._run(self._analyze_many(posts, on_result))
+
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from config import (ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_TTL, ANALYSIS_CACHE_MAX_ENTRIES,
+                    CACHE_DEFAULT_ANALYSIS, DEFAULT_ANALYSIS, GEMINI_MODEL, PROMPT_VERSION)
+
+
+def normalize_post_text(text: str) -> str:
+    """Collapse whitespace so formatting-only edits map to the same cache entry."""
+    return " ".join(text.split())
+
+
+class AnalysisCache:
+    """Persistent SQLite cache of AI analyses.
+
+    Entries are keyed by a hash of the normalized post text, the prompt template
+    version and the model name, expire after ttl seconds and are evicted least
+    recently used first once max_entries is exceeded.
+    """
+
+    def __init__(self, path: str = ANALYSIS_CACHE_PATH, ttl: float = ANALYSIS_CACHE_TTL,
+                 max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+                 cache_default_analysis: bool = CACHE_DEFAULT_ANALYSIS,
+                 prompt_version: str = PROMPT_VERSION, model: str = GEMINI_MODEL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_default_analysis = cache_default_analysis
+        self.prompt_version = prompt_version
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                "key TEXT PRIMARY KEY, analysis TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS analyses_accessed_at ON analyses (accessed_at)")
+            self._conn.execute("DELETE FROM analyses WHERE created_at < ?", (time.time() - self.ttl,))
+
+    def make_key(self, post_text: str) -> str:
+        """Content address for a post under the current prompt version and model."""
+        digest = hashlib.sha256()
+        for part in (self.prompt_version, self.model, normalize_post_text(post_text)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, post_text: str) -> Optional[Dict]:
+        """Return the cached analysis for a post, or None on a miss."""
+        key = self.make_key(post_text)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT analysis, created_at FROM analyses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now - self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE analyses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, post_text: str, analysis: Dict):
+        """Store an analysis. DEFAULT_ANALYSIS fallbacks are skipped unless configured."""
+        if analysis == DEFAULT_ANALYSIS and not self.cache_default_analysis:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, analysis, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (self.make_key(post_text), json.dumps(analysis), now, now)
+            )
+            # Keep only the most recently used max_entries rows
+            self._conn.execute(
+                "DELETE FROM analyses WHERE key IN ("
+                "SELECT key FROM analyses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        """Remove every cached analysis and reset the counters."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM analyses")
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": size
+        }
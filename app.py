@@ -1,10 +1,11 @@
+import os
 import streamlit as st
-import pandas as pd
-from linkedin_scraper import LinkedInScraper
-from ai_analyzer import AIAnalyzer
-from enrichment import PostEnricher
+from contextlib import nullcontext
+from metrics import get_metrics, profile
 import config
-import time
+
+# pandas, Gemini, requests and the NLP libraries are imported where they are
+# first needed, so the page renders before any of them has loaded
 
 # Set page config
 st.set_page_config(
@@ -28,6 +29,101 @@ def update_min_score_state():
     # Explicitly get the slider value from the widget's key and update the session state variable
     st.session_state.min_lead_score_slider = float(st.session_state.min_lead_score_slider)
 
+# Components are built once per process and shared by every session and rerun
+@st.cache_resource
+def get_scraper():
+    from linkedin_scraper import LinkedInScraper
+    return LinkedInScraper()
+
+@st.cache_resource
+def get_analyzer():
+    from ai_analyzer import AIAnalyzer, AsyncAIAnalyzer
+    return AsyncAIAnalyzer() if config.ASYNC_ANALYZER else AIAnalyzer()
+
+@st.cache_resource
+def get_enricher():
+    from enrichment import PostEnricher
+    return PostEnricher()
+
+@st.cache_resource
+def get_result_store():
+    """The lead database; its dataset handle and query cache are reused across reruns."""
+    from result_store import ResultStore
+    return ResultStore()
+
+def render_performance(performance):
+    """Per-stage latency histograms, counters and profiles of the last search."""
+    import pandas as pd
+    with st.expander("⏱️ Performance"):
+        if performance["timings"]:
+            timings = pd.DataFrame.from_dict(performance["timings"], orient="index")
+            timings.index.name = "Stage"
+            st.dataframe(timings.round(2), use_container_width=True)
+        else:
+            st.info("Enable METRICS_ENABLED in config.py to record stage timings.")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Gemini requests** (since the app started)")
+            st.json(performance["analyzer"])
+        with col2:
+            st.markdown("**Pipeline**")
+            st.json({**performance["pipeline"], **performance["counters"]})
+        if performance["profile"] is not None:
+            st.markdown(f"**CPU profile** (peak traced memory {performance['profile']['peak_memory_mb']:.1f} MB)")
+            st.code(performance["profile"]["stats"])
+            st.markdown("**Top allocations**")
+            st.code(performance["profile"]["allocations"])
+
+def render_lead_database():
+    """Browse and export every stored run, one page at a time."""
+    # Nothing stored yet: skip loading pandas and pyarrow altogether
+    if not os.path.isdir(config.RESULT_STORE_PATH) or not os.listdir(config.RESULT_STORE_PATH):
+        return
+    store = get_result_store()
+    total = store.count()
+    if not total:
+        return
+
+    st.markdown("### 🗄️ Lead Database")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        min_score = st.slider("Minimum Lead Score", 0.0, 10.0, float(config.MIN_LEAD_SCORE), 0.5, key='db_min_score_slider')
+    with col2:
+        stages = st.multiselect("Project Stage", config.PROJECT_STAGES, default=config.PROJECT_STAGES, key='db_project_stage_multiselect')
+    with col3:
+        sentiments = st.multiselect("Sentiment", ["Positive", "Neutral", "Negative"],
+                                    default=[], key='db_sentiment_multiselect', help="Leave empty to include all posts")
+    with col4:
+        dates = st.date_input("Stored Between", value=(), key='db_date_range')
+    start_date = dates[0] if len(dates) > 0 else None
+    end_date = dates[1] if len(dates) > 1 else start_date
+
+    filter_key = store.filter_key(min_score, stages, sentiments or None, start_date, end_date)
+    matching = store.count(filter_key)
+    pages = max(1, -(-matching // config.RESULT_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key='db_page')
+    offset = (int(page) - 1) * config.RESULT_PAGE_SIZE
+    st.dataframe(store.query(filter_key, offset, config.RESULT_PAGE_SIZE), use_container_width=True, hide_index=True)
+    st.caption(f"Showing {min(offset + 1, matching)}–{min(offset + config.RESULT_PAGE_SIZE, matching)} "
+               f"of {matching} matching leads ({total} stored)")
+
+    # Exports are only built on request, large databases are not rewritten on every rerun
+    col1, col2 = st.columns(2)
+    with col1:
+        export_format = st.radio("Export format", ["csv", "parquet"], horizontal=True, key='db_export_format')
+    with col2:
+        if st.button("Prepare export", key='db_prepare_export'):
+            st.session_state.db_export = (filter_key, export_format, store.export(filter_key, export_format))
+    export = st.session_state.get('db_export')
+    if export is not None and export[:2] == (filter_key, export_format):
+        st.download_button(
+            "📥 Download Lead Database",
+            export[2],
+            f"linkedin_leads.{export_format}",
+            "text/csv" if export_format == "csv" else "application/octet-stream",
+            key='download-db'
+        )
+
 def main():
     st.title("🔍 LinkedIn Lead Generator")
     st.markdown("""
@@ -57,6 +153,8 @@ def main():
             enable_enrichment = st.checkbox("Enable Email & Website Extraction", value=True, key='enable_enrichment_checkbox') # Add a key
         with col2:
             enable_sentiment = st.checkbox("Enable Sentiment Analysis", value=True, key='enable_sentiment_checkbox') # Add a key
+        st.checkbox("Capture CPU & memory profile (cProfile + tracemalloc)", value=False, key='profile_checkbox',
+                    help="Adds noticeable overhead; results appear in the Performance panel")
 
     # Search button
     if st.button("🔍 Search Posts", type="primary", key='search_button'): # Add a key
@@ -65,11 +163,17 @@ def main():
             return
 
         with st.spinner("Searching LinkedIn posts..."):
+            import pandas as pd
+            from pipeline import PostPipeline
+            rows = {}
             try:
-                # Initialize components
-                scraper = LinkedInScraper()
-                analyzer = AIAnalyzer()
-                enricher = PostEnricher()
+                # Time this search from scratch
+                get_metrics().reset()
+
+                # Shared components, built on the first search
+                scraper = get_scraper()
+                analyzer = get_analyzer()
+                enricher = get_enricher()
 
                 # Search posts
                 posts = scraper.search_posts(keywords, tags)
@@ -80,74 +184,77 @@ def main():
                     st.session_state.results = None
                     return
 
-                # Process posts
-                results = []
+                # Process posts, streaming finished rows into a live table
                 # Clear previous analysis errors
                 st.session_state.analysis_errors = []
                 progress_bar = st.progress(0)
+                cancel_placeholder = st.empty()
+                cancel_placeholder.button("⏹️ Cancel", key='cancel_button') # Clicking reruns the script, which stops the pipeline
+                live_table = st.empty()
 
-                for i, post in enumerate(posts):
-                    # Extract post data
-                    post_data = scraper.extract_post_data(post)
+                # Apply enrichment if enabled
+                if st.session_state.get('enable_enrichment_checkbox', True) or st.session_state.get('enable_sentiment_checkbox', True):
+                    pipeline = PostPipeline(scraper, analyzer, enricher)
+                else:
+                    pipeline = PostPipeline(scraper, analyzer)
 
-                    # Analyze post
-                    # Ensure post_text is a string before passing to analyzer
-                    post_text = str(post_data.get("post_text", "")) # Use .get() with default for safety
+                live_frame = None  # Finished rows in completion order, as shown in the live table
+                unrendered_rows = []
+                stream = pipeline.iter_results(
+                    posts,
+                    on_progress=lambda completed, total: progress_bar.progress(completed / total)
+                )
+                # Optional cProfile/tracemalloc capture of the analysis
+                capture_context = profile() if st.session_state.get('profile_checkbox', False) else nullcontext()
+                with capture_context as capture:
                     try:
-                        analysis = analyzer.analyze_post(post_text)
-                        analysis = analyzer.enrich_analysis(analysis)
-
-                        # Combine data - Use .get() with default values to handle potential missing keys
-                        result = {
-                            "Post Text": post_data.get("post_text", ""),
-                            "Post URL": post_data.get("post_url", ""),
-                            "Post Date": post_data.get("post_date", ""),
-                            "Tech Stack": ", ".join(analysis.get("tech_stack", [])),
-                            "Project Stage": analysis.get("project_stage", "unknown"),
-                            "Missing Features": ", ".join(analysis.get("missing_features", [])),
-                            "Potential Needs": ", ".join(analysis.get("potential_needs", [])),
-                            "Suggested Services": ", ".join(analysis.get("suggested_services", [])),
-                            "Lead Score": float(analysis.get("lead_score", 0.0)) # Ensure lead score is float
-                        }
-
-                        # Apply enrichment if enabled
-                        if st.session_state.get('enable_enrichment_checkbox', True) or st.session_state.get('enable_sentiment_checkbox', True):
-                             result = enricher.enrich_post(result)
-
-                        results.append(result)
-
-                    except Exception as e:
-                         error_message = f"Error analyzing post \"{post_data.get('post_text', '...')[:50]}...\": {str(e)}"
-                         st.session_state.analysis_errors.append(error_message)
-                         # Append a placeholder result to maintain structure even if analysis fails for a post
-                         results.append({
-                             "Post Text": post_data.get("post_text", ""),
-                             "Post URL": post_data.get("post_url", ""),
-                             "Post Date": post_data.get("post_date", ""),
-                             "Tech Stack": "Error",
-                             "Project Stage": "Error",
-                             "Missing Features": "Error",
-                             "Potential Needs": "Error",
-                             "Suggested Services": "Error",
-                             "Lead Score": 0.0 # Assign a low score on error
-                         })
-
-
-                    # Update progress
-                    progress_bar.progress((i + 1) / len(posts))
-                    time.sleep(0.05)  # Small delay to show progress
+                        for i, row in stream:
+                            rows[i] = row
+                            unrendered_rows.append(row)
+                            # Render the first lead immediately, then in chunks that grow with the
+                            # table, so redrawing it costs linear rather than quadratic time overall
+                            chunk_size = max(config.STREAM_CHUNK_SIZE, 0 if live_frame is None else len(live_frame))
+                            if len(rows) == 1 or len(unrendered_rows) >= chunk_size or len(rows) == len(posts):
+                                # Only the new rows are converted, earlier chunks are reused as they are
+                                chunk = pd.DataFrame(unrendered_rows)
+                                live_frame = chunk if live_frame is None else pd.concat([live_frame, chunk], ignore_index=True)
+                                live_table.dataframe(live_frame, use_container_width=True, hide_index=True)
+                                unrendered_rows = []
+                    finally:
+                        stream.close()
+                        st.session_state.analysis_errors = pipeline.errors
+                        # Store partial results so a cancelled or failed run keeps every row that finished
+                        st.session_state.results = pd.DataFrame([rows[j] for j in sorted(rows)]) if rows else None
+
+                # Keep the run's stage timings and counters for the Performance panel
+                st.session_state.performance = {
+                    **get_metrics().snapshot(),
+                    "analyzer": analyzer.stats(),
+                    "pipeline": {"posts": len(posts), "prefiltered": pipeline.prefiltered,
+                                 "duplicates_skipped": pipeline.duplicates_skipped, "errors": len(pipeline.errors)},
+                    "profile": None if capture is None else {
+                        "stats": capture.stats_text(),
+                        "allocations": capture.allocations_text(),
+                        "peak_memory_mb": capture.peak_memory / 1e6,
+                    },
+                }
+
+                cancel_placeholder.empty()
+                live_table.empty()
 
                 # Store results
-                if results:
-                    st.session_state.results = pd.DataFrame(results)
-                else:
-                     st.session_state.results = None
+                if rows and config.RESULT_STORE_ENABLED:
+                    get_result_store().append(st.session_state.results.assign(Keywords=keywords, Tags=tags))
 
             except Exception as e:
                 st.error(f"An error occurred during search or processing: {str(e)}")
-                st.session_state.results = None # Clear results on major error
+                if not rows:
+                    st.session_state.results = None # Clear results on major error
                 return
 
+    if st.session_state.get('cancel_button'):
+        st.info("Analysis cancelled. Showing the posts that finished before cancelling.")
+
     # Display results
     if st.session_state.results is not None:
         st.markdown("### 📊 Analysis Results")
@@ -189,19 +296,16 @@ def main():
                 # If sentiment analysis is disabled, filter by all sentiments implicitly
                 sentiment = ["Positive", "Neutral", "Negative"]
 
-        # Filter results
-        # Ensure min_score is float for comparison
-        filtered_results = st.session_state.results[
-            (st.session_state.results["Lead Score"] >= float(min_score)) &
-            (st.session_state.results["Project Stage"].isin(project_stage))
-        ]
+        # Filter results through the cached view, rebuilt only when the results change
+        from results_view import ResultsView
+        view = st.session_state.get('results_view')
+        if view is None or view.source is not st.session_state.results:
+            view = st.session_state.results_view = ResultsView(st.session_state.results)
 
-        if st.session_state.get('enable_sentiment_checkbox', True):
-             # Ensure Sentiment column exists before filtering
-            if "Sentiment" in filtered_results.columns:
-                 filtered_results = filtered_results[
-                     filtered_results["Sentiment"].isin(sentiment)
-                 ]
+        # Only filter by sentiment when sentiment analysis is enabled
+        sentiment_filter = sentiment if st.session_state.get('enable_sentiment_checkbox', True) else None
+        filter_key = ResultsView.filter_key(min_score, project_stage, sentiment_filter)
+        filtered_results = view.filter(filter_key)
 
         # Display table
         st.dataframe(
@@ -211,17 +315,17 @@ def main():
         )
 
         # Download button
-        csv = filtered_results.to_csv(index=False).encode('utf-8') # Encode for download
         st.download_button(
             "📥 Download Results",
-            csv,
+            view.to_csv(filter_key),
             "linkedin_leads.csv",
             "text/csv",
             key='download-csv'
         )
 
         # Display insights
-        if not filtered_results.empty:
+        metrics = view.metrics(filter_key)
+        if metrics["count"]:
             st.markdown("### 📈 Insights")
 
             col1, col2 = st.columns(2)
@@ -229,33 +333,36 @@ def main():
             with col1:
                 st.metric(
                     "Average Lead Score",
-                    f"{filtered_results['Lead Score'].mean():.1f}"
+                    f"{metrics['average_lead_score']:.1f}"
                 )
-                if st.session_state.get('enable_sentiment_checkbox', True) and "Sentiment" in filtered_results.columns:
+                if st.session_state.get('enable_sentiment_checkbox', True) and metrics["positive_sentiment_pct"] is not None:
                     st.metric(
                         "Positive Sentiment %",
-                        f"{(filtered_results['Sentiment'] == 'Positive').mean() * 100:.1f}%"
+                        f"{metrics['positive_sentiment_pct']:.1f}%"
                     )
 
             with col2:
-                if st.session_state.get('enable_enrichment_checkbox', True) and ("Email" in filtered_results.columns or "Website" in filtered_results.columns):
-                     contact_info_count = 0
-                     if "Email" in filtered_results.columns: contact_info_count += filtered_results['Email'].notna().sum()
-                     if "Website" in filtered_results.columns: contact_info_count += filtered_results['Website'].notna().sum()
+                if st.session_state.get('enable_enrichment_checkbox', True) and metrics["contact_info_count"] is not None:
                      st.metric(
                          "Posts with Contact Info",
-                         f"{contact_info_count}"
+                         f"{metrics['contact_info_count']}"
                      )
 
                 # Check if 'Engagement Score' column exists before accessing
-                if 'Engagement Score' in filtered_results.columns:
+                if metrics["average_engagement"] is not None:
                     st.metric(
                         "Average Engagement",
-                        f"{filtered_results['Engagement Score'].mean():.1f}"
+                        f"{metrics['average_engagement']:.1f}"
                     )
-        else:\
+        else:
              st.info("No leads found matching the selected filters.")
 
+    if config.RESULT_STORE_ENABLED:
+        render_lead_database()
+
+    if st.session_state.get('performance'):
+        render_performance(st.session_state.performance)
+
     # Display errors from analysis if any
     if st.session_state.get('analysis_errors', []):
         st.markdown("### ⚠️ Analysis Errors")
@@ -0,0 +1,317 @@
+"""Headless batch runner: search, analyze and enrich posts without the Streamlit app.
+
+Reads one search per line from a queries file, as "keywords | tags" (tags are
+optional, blank lines and lines starting with '#' are ignored), and streams
+every finished row to the output directory as it completes:
+
+    python -m batch queries.txt --output runs/nightly --format parquet
+
+Finished posts are recorded in an append-only _checkpoint.jsonl next to the
+results, so rerunning the same command after a crash or kill resumes where
+it stopped instead of starting over. Only one search's posts and at most
+--flush-every Parquet rows are held in memory at a time.
+
+Per-stage latency histograms and request counters for the run are written to
+_metrics.json in the output directory; --profile also saves a cProfile dump
+(_profile.pstats) and the top tracemalloc allocations (_allocations.txt).
+"""
+import argparse
+import json
+import os
+import sys
+from contextlib import nullcontext
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import config
+from ai_analyzer import AIAnalyzer, AsyncAIAnalyzer
+from enrichment import PostEnricher
+from linkedin_scraper import LinkedInScraper
+from metrics import get_metrics, profile
+from pipeline import PostPipeline
+
+CHECKPOINT_FILE = "_checkpoint.jsonl"  # Leading underscore: Parquet dataset readers skip it
+METRICS_FILE = "_metrics.json"
+PROFILE_FILE = "_profile.pstats"
+ALLOCATIONS_FILE = "_allocations.txt"
+JSONL_FILE = "results.jsonl"
+PARQUET_PART = "part-{:05d}.parquet"
+
+# Fixed column types so every Parquet part has the same schema, even when a
+# part happens to contain only missing values for a column
+PARQUET_TYPES = {
+    "Reactions": "int64",
+    "Lead Score": "float64",
+    "Sentiment Score": "float64",
+    "Engagement Score": "int64",
+}
+
+
+def read_queries(path: str) -> List[Tuple[str, str]]:
+    """Parse a queries file into (keywords, tags) pairs."""
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            keywords, _, tags = line.partition("|")
+            queries.append((keywords.strip(), tags.strip()))
+    return queries
+
+
+def query_key(keywords: str, tags: str) -> str:
+    return f"{keywords} | {tags}" if tags else keywords
+
+
+def _truncate_torn_line(path: str):
+    """Drop a partial last line left by a killed run so new lines start clean."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(max(0, size - 65536))
+        tail = f.read()
+        if tail.endswith(b"\n"):
+            return
+        last_newline = tail.rfind(b"\n")
+        f.truncate(size - len(tail) + last_newline + 1 if last_newline >= 0 else max(0, size - len(tail)))
+
+
+class Checkpoint:
+    """Append-only record of finished posts and searches in an output directory.
+
+    Each line is {"query": ..., "url": ...} for a finished post or
+    {"query": ..., "done": true} for a finished search. A line is only written
+    after the matching row has been flushed to the output, so a post whose
+    line was cut short by a kill is simply processed again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.finished_posts: Set[Tuple[str, str]] = set()
+        self.finished_queries: Set[str] = set()
+        _truncate_torn_line(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry.get("done"):
+                        self.finished_queries.add(entry["query"])
+                    else:
+                        self.finished_posts.add((entry["query"], entry["url"]))
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _append(self, entry: Dict):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def post_done(self, query: str, url: str):
+        self.finished_posts.add((query, url))
+        self._append({"query": query, "url": url})
+
+    def query_done(self, query: str):
+        self.finished_queries.add(query)
+        self._append({"query": query, "done": True})
+
+    def close(self):
+        self._file.close()
+
+
+class JSONLWriter:
+    """Appends each row to results.jsonl as soon as it is written."""
+
+    def __init__(self, directory: str):
+        path = os.path.join(directory, JSONL_FILE)
+        _truncate_torn_line(path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, row: Dict) -> bool:
+        """Write a row; returns True once it (and any earlier rows) are on disk."""
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return True
+
+    def flush(self) -> bool:
+        return True
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Buffers rows and writes them out as numbered Parquet part files.
+
+    Parts are never rewritten, so a resumed run simply adds new parts; read
+    the directory back as one dataset with pandas.read_parquet(directory).
+    """
+
+    def __init__(self, directory: str, flush_every: int):
+        import pandas as pd  # Only needed for Parquet output
+        self._pd = pd
+        self.directory = directory
+        self.flush_every = max(1, flush_every)
+        self._rows: List[Dict] = []
+        self._part = sum(1 for name in os.listdir(directory) if name.endswith(".parquet"))
+
+    def write(self, row: Dict) -> bool:
+        self._rows.append(row)
+        return len(self._rows) >= self.flush_every and self.flush()
+
+    def flush(self) -> bool:
+        """Write buffered rows to a new part file; returns True if anything was written."""
+        if not self._rows:
+            return False
+        df = self._pd.DataFrame(self._rows)
+        for column in df:
+            dtype = PARQUET_TYPES.get(column, "string")
+            df[column] = df[column].astype("Int64" if dtype == "int64" else dtype)
+        name = PARQUET_PART.format(self._part)
+        temp_path = os.path.join(self.directory, "." + name)
+        df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, os.path.join(self.directory, name))  # A killed run never leaves a half-written part
+        self._part += 1
+        self._rows = []
+        return True
+
+    def close(self):
+        self.flush()
+
+
+class BatchRunner:
+    """Runs every query through PostPipeline and streams rows to a writer."""
+
+    def __init__(self, output_dir: str, output_format: str = "jsonl",
+                 analysis_workers: int = config.ANALYSIS_WORKERS,
+                 enrichment_workers: int = config.ENRICHMENT_WORKERS,
+                 batch_size: int = config.ANALYSIS_BATCH_SIZE,
+                 enrich: bool = True, flush_every: int = 500):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.checkpoint = Checkpoint(os.path.join(output_dir, CHECKPOINT_FILE))
+        if output_format == "parquet":
+            self.writer = ParquetWriter(output_dir, flush_every)
+        else:
+            self.writer = JSONLWriter(output_dir)
+        self.scraper = LinkedInScraper()
+        self.analyzer = AsyncAIAnalyzer() if config.ASYNC_ANALYZER else AIAnalyzer()
+        self.pipeline = PostPipeline(
+            self.scraper, self.analyzer, PostEnricher() if enrich else None,
+            analysis_workers=analysis_workers,
+            enrichment_workers=enrichment_workers,
+            batch_size=batch_size
+        )
+        self.rows_written = 0
+        self.errors: List[str] = []
+        self._unflushed: List[Tuple[str, str]] = []  # (query, url) written but not yet on disk
+
+    def _write(self, query: str, url: str, row: Dict):
+        self._unflushed.append((query, url))
+        if self.writer.write(row):
+            self._commit()
+
+    def _commit(self):
+        for query, url in self._unflushed:
+            self.checkpoint.post_done(query, url)
+        self._unflushed = []
+
+    def iter_query(self, keywords: str, tags: str) -> Iterator[Dict]:
+        """Yield result rows for one search, skipping posts finished in an earlier run."""
+        key = query_key(keywords, tags)
+        posts = [
+            post for post in self.scraper.search_posts(keywords, tags)
+            if (key, post.get("url", "")) not in self.checkpoint.finished_posts
+        ]
+        for i, row in self.pipeline.iter_results(posts):
+            row.update({"Keywords": keywords, "Tags": tags})
+            self._write(key, posts[i].get("url", ""), row)
+            yield row
+        self.errors.extend(self.pipeline.errors)
+
+    def run(self, queries: List[Tuple[str, str]], verbose: bool = True):
+        try:
+            for keywords, tags in queries:
+                key = query_key(keywords, tags)
+                if key in self.checkpoint.finished_queries:
+                    if verbose:
+                        print(f"skip (already done): {key}", file=sys.stderr)
+                    continue
+                try:
+                    count = sum(1 for _ in self.iter_query(keywords, tags))
+                except Exception as e:
+                    self.errors.append(f"Error processing \"{key}\": {str(e)}")
+                    if verbose:
+                        print(self.errors[-1], file=sys.stderr)
+                    continue
+                # Rows must be on disk before the search is marked done
+                if self.writer.flush():
+                    self._commit()
+                self.checkpoint.query_done(key)
+                self.rows_written += count
+                if verbose:
+                    print(f"done: {key} ({count} posts)", file=sys.stderr)
+        finally:
+            if self.writer.flush():
+                self._commit()
+            self.writer.close()
+            self.checkpoint.close()
+            if isinstance(self.analyzer, AsyncAIAnalyzer):
+                self.analyzer.close()
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m batch",
+        description="Search, analyze and enrich LinkedIn posts without the Streamlit app."
+    )
+    parser.add_argument("queries", help='File with one "keywords | tags" search per line')
+    parser.add_argument("--output", default="batch_output", help="Output directory (also holds the checkpoint)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=config.ANALYSIS_WORKERS,
+                        help="Concurrent analysis workers")
+    parser.add_argument("--enrichment-workers", type=int, default=config.ENRICHMENT_WORKERS,
+                        help="Enrichment worker processes, 0 to enrich inline")
+    parser.add_argument("--batch-size", type=int, default=config.ANALYSIS_BATCH_SIZE,
+                        help="Posts per Gemini request")
+    parser.add_argument("--flush-every", type=int, default=500,
+                        help="Rows per Parquet part file")
+    parser.add_argument("--no-enrich", action="store_true", help="Skip email, website, sentiment and traction enrichment")
+    parser.add_argument("--metrics-json", help=f"Where to write stage timings (default: OUTPUT/{METRICS_FILE})")
+    parser.add_argument("--profile", action="store_true", help="Capture a cProfile and tracemalloc profile of the run")
+    parser.add_argument("--quiet", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    runner = BatchRunner(
+        args.output, args.format,
+        analysis_workers=args.workers,
+        enrichment_workers=args.enrichment_workers,
+        batch_size=args.batch_size,
+        enrich=not args.no_enrich,
+        flush_every=args.flush_every
+    )
+    with (profile() if args.profile else nullcontext()) as capture:
+        runner.run(read_queries(args.queries), verbose=not args.quiet)
+
+    with open(args.metrics_json or os.path.join(args.output, METRICS_FILE), "w", encoding="utf-8") as f:
+        f.write(get_metrics().to_json(
+            analyzer=runner.analyzer.stats(),
+            rows_written=runner.rows_written,
+            errors=len(runner.errors)
+        ))
+    if capture is not None:
+        capture.dump(os.path.join(args.output, PROFILE_FILE))
+        with open(os.path.join(args.output, ALLOCATIONS_FILE), "w", encoding="utf-8") as f:
+            f.write(f"peak traced memory: {capture.peak_memory / 1e6:.1f} MB\n{capture.allocations_text(50)}\n")
+    if not args.quiet:
+        print(f"{runner.rows_written} rows written to {args.output}, {len(runner.errors)} errors", file=sys.stderr)
+    return 1 if runner.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Benchmark the app's processing path end to end on replayed traffic.
+
+Runs search hits through ReplayScraper, an AIAnalyzer on a ReplayModel, the
+enricher and PostPipeline, the way app.py does, and reports posts/sec, time
+to first result and peak memory at each size. No network or API keys are
+needed. Without --fixtures, a synthetic recording is built from the saved
+post pages and the labeled prefilter posts; pass a file made with
+`python -m replay record ...` to replay real traffic.
+
+    python benchmarks/bench_end_to_end.py --posts 20 200 2000
+    python benchmarks/bench_end_to_end.py --fixtures fixtures.jsonl.gz --throttle-rate 0.02 --malformed-rate 0.05
+
+Each size runs in a fresh interpreter, so peak RSS covers that run only;
+the largest enrichment worker process is reported separately. Replayed
+posts beyond the recorded ones reuse recorded pages, so deduplication is off
+unless --deduplicate is passed. The analysis and HTTP caches are always
+bypassed.
+"""
+import argparse
+import gzip
+import html
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config  # noqa: E402
+from extraction import get_extractor  # noqa: E402
+from prefilter import PreScorer  # noqa: E402
+from replay import Fixtures, ReplayModel, ReplayScraper, prompt_key  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def synthetic_fixtures(seed: int = 0) -> Fixtures:
+    """A recording of one saved page per labeled post, with plausible latencies."""
+    pages = []
+    for name in sorted(os.listdir(os.path.join(FIXTURES, "pages"))):
+        with gzip.open(os.path.join(FIXTURES, "pages", name), "rt", encoding="utf-8") as handle:
+            pages.append(handle.read())
+    with open(os.path.join(FIXTURES, "prefilter_labeled.jsonl"), encoding="utf-8") as handle:
+        texts = [json.loads(line)["text"] for line in handle if line.strip()]
+
+    extractor = get_extractor()
+    prescorer = PreScorer()
+    rng = random.Random(seed)
+    fixtures = Fixtures()
+    for i, text in enumerate(texts):
+        page = pages[i % len(pages)]
+        original = html.escape(extractor.extract(page)["text"], quote=False)
+        fixtures.add({"kind": "http", "key": f"https://www.linkedin.com/posts/replay-{i}",
+                      "body": page.replace(original, html.escape(text, quote=False), 1),
+                      "latency": rng.uniform(0.2, 0.8)})
+        fixtures.add({"kind": "gemini", "key": prompt_key(config.ANALYSIS_PROMPT.format(post_text=text)),
+                      "body": json.dumps(prescorer.local_analysis(text)), "latency": rng.uniform(1.0, 2.5)})
+    return fixtures
+
+
+def run_once(args, count: int) -> dict:
+    """Process count replayed posts in this interpreter and return the measurements."""
+    import pandas as pd
+    from ai_analyzer import AIAnalyzer, AsyncAIAnalyzer
+    from enrichment import PostEnricher
+    from linkedin_scraper import HostThrottle
+    from metrics import get_metrics
+    from pipeline import PostPipeline, shutdown_enrichment_pools
+    from rate_limiter import AdaptiveRateLimiter
+
+    fixtures = Fixtures.load(args.fixtures) if args.fixtures else synthetic_fixtures(args.seed)
+    scraper = ReplayScraper(fixtures, latency=args.http_latency, latency_scale=args.latency_scale,
+                            throttle_rate=args.throttle_rate, seed=args.seed)
+    scraper.throttle = HostThrottle(min_interval=args.host_interval, jitter=0.0)
+    model = ReplayModel(fixtures, latency=args.gemini_latency, latency_scale=args.latency_scale,
+                        throttle_rate=args.throttle_rate, malformed_rate=args.malformed_rate, seed=args.seed)
+    limiter = AdaptiveRateLimiter(requests_per_minute=args.rpm)
+    analyzer = (AsyncAIAnalyzer(rate_limiter=limiter, model=model) if config.ASYNC_ANALYZER
+                else AIAnalyzer(rate_limiter=limiter, model=model))
+    analyzer.cache = None
+    enricher = None if args.no_enrich else PostEnricher()
+    pipeline = PostPipeline(scraper, analyzer, enricher,
+                            analysis_workers=args.workers,
+                            enrichment_workers=args.enrichment_workers,
+                            batch_size=args.batch_size,
+                            deduplicate=args.deduplicate)
+    posts = scraper.recorded_posts(count)
+    get_metrics().reset()
+
+    start = time.perf_counter()
+    first_result = None
+    rows = {}
+    for i, row in pipeline.iter_results(posts):
+        if first_result is None:
+            first_result = time.perf_counter() - start
+        rows[i] = row
+    results = pd.DataFrame([rows[i] for i in sorted(rows)])
+    elapsed = time.perf_counter() - start
+    if isinstance(analyzer, AsyncAIAnalyzer):
+        analyzer.close()
+    # Workers only count towards RUSAGE_CHILDREN once they have exited and been joined
+    shutdown_enrichment_pools()
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "posts": count,
+        "rows": len(results),
+        "seconds": elapsed,
+        "posts_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "first_result_s": first_result,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 1e6,
+        "worker_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 1e6,
+        "errors": len(pipeline.errors),
+        "prefiltered": pipeline.prefiltered,
+        "analyzer": analyzer.stats(),
+        "gemini": model.stats(),
+        "http": scraper.replayer.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--fixtures", help="Recorded fixture file, default a synthetic recording")
+    parser.add_argument("--http-latency", type=float, help="Fixed page fetch latency, default as recorded")
+    parser.add_argument("--gemini-latency", type=float, help="Fixed Gemini latency, default as recorded")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on every replayed latency")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests failing with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of Gemini responses cut off")
+    parser.add_argument("--rpm", type=float, default=1e9, help="Gemini requests per minute, default unlimited")
+    parser.add_argument("--host-interval", type=float, default=0.0,
+                        help=f"Seconds between page fetches per host (live: {config.SCRAPER_MIN_HOST_INTERVAL})")
+    parser.add_argument("--workers", type=int, default=config.ANALYSIS_WORKERS)
+    parser.add_argument("--enrichment-workers", type=int, default=config.ENRICHMENT_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=config.ANALYSIS_BATCH_SIZE)
+    parser.add_argument("--deduplicate", action="store_true")
+    parser.add_argument("--no-enrich", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print one JSON line per size")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_once(args, args.posts[-1])))
+        return
+
+    if not args.json:
+        print(f"workers={args.workers} enrichment_workers={args.enrichment_workers} batch_size={args.batch_size} "
+              f"throttle_rate={args.throttle_rate} malformed_rate={args.malformed_rate}")
+        print(f"{'posts':>6} {'seconds':>8} {'posts/s':>8} {'TTFR s':>7} {'RSS MB':>7} {'worker MB':>10} "
+              f"{'calls':>6} {'429s':>5} {'parse fails':>11} {'errors':>6}")
+    argv = [arg for arg in sys.argv[1:] if arg != "--json"]
+    for count in args.posts:
+        command = [sys.executable, os.path.abspath(__file__), *argv, "--single", "--posts", str(count)]
+        output = subprocess.run(command, cwd=ROOT, stdout=subprocess.PIPE, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if args.json:
+            print(json.dumps(result))
+            continue
+        print(f"{count:>6} {result['seconds']:>8.2f} {result['posts_per_sec']:>8.1f} "
+              f"{result['first_result_s'] or 0:>7.2f} {result['peak_rss_mb']:>7.0f} "
+              f"{result['worker_peak_rss_mb']:>10.0f} {result['analyzer']['api_calls']:>6} "
+              f"{result['gemini']['throttled'] + result['http']['throttled']:>5} "
+              f"{result['analyzer']['parse_failures']:>11} {result['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark PostEnricher.enrich_frame against per-row enrich_post.
+
+    python benchmarks/bench_enrichment.py --sizes 1000 10000 100000 --backend lexicon
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+from enrichment import PostEnricher  # noqa: E402
+from sentiment import BACKENDS, get_sentiment_backend  # noqa: E402
+
+TEMPLATES = [
+    "Just launched my {tool} dashboard! Would love your feedback and thoughts. https://{site}.io",
+    "Our {tool} prototype is growing fast, 500 users already. Reach me at founder@{site}.com",
+    "Struggling with auth in {tool}. Looking to partner with someone who has done this before.",
+    "Terrible week, the {tool} deploy broke and customers are angry.",
+    "Built a small internal tool with {tool} over the weekend. Nothing fancy.",
+]
+TOOLS = ["Streamlit", "Gradio", "Flask", "Django", "Next.js"]
+SITES = ["gmail", "outlook", "yahoo"]
+
+
+def make_rows(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        text = rng.choice(TEMPLATES).format(tool=rng.choice(TOOLS), site=rng.choice(SITES))
+        rows.append({"Post Text": f"{text} #{i}", "Lead Score": float(i % 10)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="textblob", help="Sentiment backend")
+    args = parser.parse_args()
+
+    enricher = PostEnricher(get_sentiment_backend(args.backend))
+    # Warm up so one-off costs (worker processes, lexicon load) are not timed
+    enricher.enrich_frame(pd.DataFrame(make_rows(2000, seed=1)))
+    print(f"{'posts':>8} {'per-row':>10} {'frame':>10} {'speedup':>8}")
+    for size in args.sizes:
+        rows = make_rows(size)
+
+        start = time.perf_counter()
+        per_row = [enricher.enrich_post(row) for row in rows]
+        row_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        frame = enricher.enrich_frame(pd.DataFrame(rows))
+        frame_time = time.perf_counter() - start
+
+        assert frame.to_dict("records") == per_row, "enrich_frame output differs from enrich_post"
+        print(f"{size:>8} {row_time:>9.2f}s {frame_time:>9.2f}s {row_time / frame_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
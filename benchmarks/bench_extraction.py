@@ -0,0 +1,58 @@
+"""Benchmark HTML extractors on saved LinkedIn post fixture pages.
+
+    python benchmarks/bench_extraction.py --repeat 20
+"""
+import argparse
+import glob
+import gzip
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import EXTRACTORS, HTMLParser, get_extractor  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+
+def load_pages() -> list:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html.gz"))):
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            pages.append(handle.read())
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="Passes over the fixture pages")
+    args = parser.parse_args()
+
+    pages = load_pages()
+    names = [name for name in EXTRACTORS if name != "selectolax" or HTMLParser is not None]
+    baseline = [get_extractor("full").extract(page) for page in pages]
+    print(f"{len(pages)} pages, {sum(map(len, pages)) // len(pages) // 1024} KB average")
+    # tracemalloc only sees Python allocations, not selectolax's C parser
+    print(f"{'extractor':>12} {'ms/page':>10} {'py peak MB':>11}")
+
+    for name in names:
+        extractor = get_extractor(name)
+        assert [extractor.extract(page) for page in pages] == baseline, f"{name} output differs from full parse"
+
+        tracemalloc.start()
+        extractor.extract(pages[0])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for page in pages:
+                extractor.extract(page)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12} {elapsed / (args.repeat * len(pages)) * 1000:>10.2f} {peak / 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Measure cold import time of the app's modules and Streamlit run/rerun latency.
+
+Each module is imported in a fresh interpreter with -X importtime, repeated a
+few times, and the median cumulative time is compared against a budget, so
+a heavy dependency creeping back into a module-level import fails the run:
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --rerun   # also time app.py runs via AppTest
+
+Exits non-zero when any measurement exceeds its budget.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median cold import budgets in milliseconds
+IMPORT_BUDGETS_MS = {
+    "config": 25,
+    "ai_analyzer": 300,
+    "enrichment": 200,
+    "linkedin_scraper": 500,
+    "pipeline": 400,
+    "app": 1200,  # Mostly streamlit itself
+}
+
+# First script run (cold process) and median rerun budgets in milliseconds
+RUN_BUDGETS_MS = {
+    "first_run": 3000,
+    "rerun": 150,
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+RERUN_SCRIPT = """
+import json, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=60)
+start = time.perf_counter()
+app.run()
+first = time.perf_counter() - start
+reruns = []
+for _ in range({reruns}):
+    start = time.perf_counter()
+    app.run()
+    reruns.append(time.perf_counter() - start)
+print(json.dumps({{"first_run": first, "reruns": reruns}}))
+"""
+
+
+def _env():
+    return {**os.environ, "PYTHONWARNINGS": "ignore"}
+
+
+def import_profile(module: str):
+    """Cold-import module, returning (cumulative ms, [(child ms, child)])."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, env=_env(), capture_output=True, text=True, check=True)
+    total, children = None, []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)) / 1000, len(match.group(3)), match.group(4)
+        if indent == 1 and name == module:
+            total = cumulative
+        elif indent == 3:
+            children.append((cumulative, name))
+    return total, sorted(children, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=list(IMPORT_BUDGETS_MS))
+    parser.add_argument("--repeat", type=int, default=5, help="Cold imports per module")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest direct imports to show")
+    parser.add_argument("--rerun", action="store_true", help="Also time app.py runs with streamlit's AppTest")
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'module':<18}{'median ms':>10}{'budget':>8}  heaviest direct imports")
+    for module in args.modules:
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        median = statistics.median(total for total, _ in runs)
+        budget = IMPORT_BUDGETS_MS.get(module)
+        heaviest = ", ".join(f"{name} {ms:.0f}" for ms, name in runs[0][1][:args.top])
+        print(f"{module:<18}{median:>10.1f}{budget or '-':>8}  {heaviest}")
+        if budget is not None and median > budget:
+            over_budget.append(f"import {module}: {median:.0f} ms > {budget} ms")
+
+    if args.rerun:
+        result = subprocess.run([sys.executable, "-c", RERUN_SCRIPT.format(reruns=args.reruns)],
+                                cwd=ROOT, env=_env(), capture_output=True, text=True, check=True)
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        measured = {
+            "first_run": timings["first_run"] * 1000,
+            "rerun": statistics.median(timings["reruns"]) * 1000,
+        }
+        for name, ms in measured.items():
+            print(f"app {name:<14}{ms:>10.1f}{RUN_BUDGETS_MS[name]:>8}")
+            if ms > RUN_BUDGETS_MS[name]:
+                over_budget.append(f"app {name}: {ms:.0f} ms > {RUN_BUDGETS_MS[name]} ms")
+
+    if over_budget:
+        sys.exit("over budget:\n  " + "\n  ".join(over_budget))
+
+
+if __name__ == "__main__":
+    main()
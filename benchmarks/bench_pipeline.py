@@ -0,0 +1,123 @@
+"""Benchmark PostPipeline against the original serial loop in app.main.
+
+Uses a fake scraper and a fake analyzer with configurable latency so no
+LinkedIn or Gemini access is needed.
+
+    python benchmarks/bench_pipeline.py --posts 50 --latency 0.5 --fetch-latency 0.5 --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import PostPipeline, build_result  # noqa: E402
+
+
+class FakeScraper:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def extract_post_data(self, post):
+        time.sleep(self.latency)
+        return {"post_text": post, "post_url": "https://www.linkedin.com/posts/fake", "post_date": ""}
+
+
+class FakeAnalyzer:
+    ANALYSIS = {
+        "tech_stack": ["streamlit"],
+        "project_stage": "mvp",
+        "missing_features": ["login"],
+        "potential_needs": ["authentication"],
+        "lead_score": 7.0
+    }
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.posts_analyzed = 0
+
+    def analyze_post(self, post_text: str) -> dict:
+        time.sleep(self.latency)
+        self.posts_analyzed += 1
+        return self.ANALYSIS.copy()
+
+    def analyze_batch(self, posts: list) -> list:
+        time.sleep(self.latency)
+        self.posts_analyzed += len(posts)
+        return [self.ANALYSIS.copy() for _ in posts]
+
+    def enrich_analysis(self, analysis: dict) -> dict:
+        return analysis
+
+
+class FakeEnricher:
+    def enrich_post(self, post_data: dict) -> dict:
+        enriched_data = post_data.copy()
+        enriched_data["Engagement Score"] = sum(ord(c) for c in post_data["Post Text"]) % 5
+        return enriched_data
+
+
+def run_serial(posts, scraper, analyzer, enricher):
+    """The loop app.main used before PostPipeline, including the progress sleep."""
+    results = []
+    for post in posts:
+        post_data = scraper.extract_post_data(post)
+        analysis = analyzer.analyze_post(str(post_data.get("post_text", "")))
+        results.append(enricher.enrich_post(build_result(post_data, analysis)))
+        time.sleep(0.05)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake analyzer latency in seconds")
+    parser.add_argument("--fetch-latency", type=float, default=0.5, help="Fake scraper latency in seconds")
+    parser.add_argument("--workers", type=int, default=4, help="Analysis workers")
+    parser.add_argument("--fetch-workers", type=int, default=8, help="Page fetch workers")
+    parser.add_argument("--enrichment-workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=1, help="Posts per analyze_batch call")
+    parser.add_argument("--duplicates", type=float, default=0.0, help="Fraction of posts that are reposts")
+    args = parser.parse_args()
+
+    unique = max(1, round(args.posts * (1 - args.duplicates)))
+    posts = [f"Built project number {i % unique} with Streamlit and Python, looking for feedback on the login flow"
+             for i in range(args.posts)]
+    scraper, analyzer, enricher = FakeScraper(args.fetch_latency), FakeAnalyzer(args.latency), FakeEnricher()
+
+    start = time.perf_counter()
+    serial = run_serial(posts, scraper, analyzer, enricher)
+    serial_time = time.perf_counter() - start
+
+    serial_calls = analyzer.posts_analyzed
+    analyzer.posts_analyzed = 0
+    pipeline = PostPipeline(scraper, analyzer, enricher,
+                            analysis_workers=args.workers,
+                            fetch_workers=args.fetch_workers,
+                            enrichment_workers=args.enrichment_workers,
+                            batch_size=args.batch_size,
+                            prefilter=False)  # The serial loop sends every post to the analyzer
+    start = time.perf_counter()
+    first_result_time = None
+    concurrent = [None] * len(posts)
+    for i, row in pipeline.iter_results(posts):
+        if first_result_time is None:
+            first_result_time = time.perf_counter() - start
+        concurrent[i] = row
+    pipeline_time = time.perf_counter() - start
+
+    assert concurrent == serial, "pipeline output differs from serial loop"
+
+    print(f"posts={args.posts} latency={args.latency}s fetch_latency={args.fetch_latency}s "
+          f"workers={args.workers} fetch_workers={args.fetch_workers} batch_size={args.batch_size}")
+    print(f"serial:   {serial_time:8.2f}s")
+    print(f"pipeline: {pipeline_time:8.2f}s")
+    print(f"speedup:  {serial_time / pipeline_time:8.2f}x")
+    print(f"posts analyzed: serial {serial_calls}, pipeline {analyzer.posts_analyzed} "
+          f"({pipeline.duplicates_skipped} duplicates shared)")
+    print(f"time to first result: {first_result_time:.2f}s (serial loop renders after {serial_time:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Check PreScorer recall and skip rate against a labeled set of posts.
+
+Each line of the fixture is {"text": ..., "lead": true|false}, where lead
+marks posts that should reach the AI analyzer. Exits non-zero when recall on
+leads falls below --min-recall, so threshold or weight changes can be checked
+before they drop real leads.
+
+    python benchmarks/bench_prefilter.py --threshold 2.0
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from prefilter import PreScorer  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "prefilter_labeled.jsonl")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--threshold", type=float, default=config.PREFILTER_THRESHOLD)
+    parser.add_argument("--min-recall", type=float, default=1.0, help="Fail below this recall on leads")
+    args = parser.parse_args()
+
+    with open(args.fixture, encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    prescorer = PreScorer(threshold=args.threshold)
+    start = time.perf_counter()
+    sent = [prescorer.screen(sample["text"]) is None for sample in samples]
+    elapsed = time.perf_counter() - start
+
+    leads = [keep for keep, sample in zip(sent, samples) if sample["lead"]]
+    missed = [sample["text"] for keep, sample in zip(sent, samples) if sample["lead"] and not keep]
+    false_positives = sum(keep for keep, sample in zip(sent, samples) if not sample["lead"])
+    recall = sum(leads) / len(leads) if leads else 1.0
+    stats = prescorer.stats()
+
+    print(f"samples={len(samples)} leads={len(leads)} threshold={args.threshold}")
+    print(f"recall on leads:   {recall:6.1%}")
+    print(f"LLM calls skipped: {stats['llm_calls_skipped']} ({stats['skip_rate']:.1%})")
+    print(f"cold posts sent:   {false_positives}")
+    print(f"scoring time:      {elapsed / len(samples) * 1000:.3f} ms/post")
+    for text in missed:
+        print(f"missed lead: {text[:80]}")
+
+    if recall < args.min_recall:
+        sys.exit(f"recall {recall:.1%} is below --min-recall {args.min_recall:.1%}")
+
+
+if __name__ == "__main__":
+    main()
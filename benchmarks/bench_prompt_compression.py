@@ -0,0 +1,75 @@
+"""Measure estimated prompt tokens per post with and without prompt compression.
+
+Builds synthetic LinkedIn-style posts (emoji, tracking URLs, hashtag walls,
+long bodies), formats them into ANALYSIS_PROMPT before and after
+prompt_compression.compress_post, and reports the estimated tokens per request,
+the compression time, and checks that no tech or missing-feature keyword is
+lost. Token counts are the same ~4 characters per token estimate the analyzer
+uses for rate limiting.
+
+    python benchmarks/bench_prompt_compression.py --posts 500 --budget 400
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ANALYSIS_PROMPT, MISSING_FEATURES, POST_TOKEN_BUDGET, TECH_STACK_KEYWORDS  # noqa: E402
+from prompt_compression import _keyword_matcher, compress_post, estimate_tokens  # noqa: E402
+
+FILLER = [
+    "Grateful for everyone who supported us on this journey so far.",
+    "It took us months of late nights and way too much coffee.",
+    "Our team learned a lot about shipping fast and listening to users.",
+    "Here is what went well, and what we would do differently next time.",
+    "If you are a founder building in public, I would love to connect.",
+]
+HASHTAGS = ["#buildinpublic", "#startup", "#founder", "#indiehacker", "#saas", "#ai", "#growth",
+            "#productivity", "#tech", "#innovation", "#python", "#streamlit", "#webdev"]
+EMOJI = ["🚀", "🎉", "🔥", "💡", "👇", "✅", "🙏"]
+
+
+def make_post(rng: random.Random) -> str:
+    parts = [f"{rng.choice(EMOJI)} Just launched our new tool {rng.choice(EMOJI)}"]
+    for _ in range(rng.randint(2, 40)):
+        parts.append(rng.choice(FILLER))
+        if rng.random() < 0.1:
+            parts.append(f"Built with {rng.choice(TECH_STACK_KEYWORDS)}, still missing {rng.choice(MISSING_FEATURES)}.")
+    parts.append(f"Try it: https://example.com/app?utm_source=linkedin&utm_medium=social&utm_campaign=launch&id={rng.randint(1, 99)}")
+    parts.append("\n\n\n" + " ".join(rng.sample(HASHTAGS, rng.randint(3, len(HASHTAGS)))))
+    return "  ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--budget", type=int, default=POST_TOKEN_BUDGET, help="Post token budget")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    posts = [make_post(rng) for _ in range(args.posts)]
+    matcher = _keyword_matcher()
+
+    start = time.perf_counter()
+    compressed = [compress_post(post, args.budget) for post in posts]
+    elapsed = time.perf_counter() - start
+
+    before = [estimate_tokens(ANALYSIS_PROMPT.format(post_text=post)) for post in posts]
+    after = [estimate_tokens(ANALYSIS_PROMPT.format(post_text=post)) for post in compressed]
+    lost = sum(bool(matcher.find(post) - matcher.find(short)) for post, short in zip(posts, compressed))
+
+    print(f"posts={args.posts} budget={args.budget} tokens")
+    print(f"prompt tokens/request: {sum(before) / len(before):8.1f} -> {sum(after) / len(after):8.1f} "
+          f"({1 - sum(after) / sum(before):.1%} fewer)")
+    print(f"largest prompt:        {max(before):8d} -> {max(after):8d}")
+    print(f"compression time:      {elapsed / len(posts) * 1000:8.3f} ms/post")
+    print(f"posts that lost a keyword: {lost}")
+    assert lost == 0, "compression dropped a tech or missing-feature keyword"
+
+
+if __name__ == "__main__":
+    main()
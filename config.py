@@ -1,23 +1,74 @@
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
 
-# Load environment variables
-load_dotenv()
 
-# API Keys
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-SERPAPI_API_KEY = os.getenv('SERPAPI_API_KEY')
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+# Load environment variables from .env on first use rather than at import
+@lru_cache(maxsize=1)
+def load_env():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+# API Keys, read from the environment when accessed (config.GEMINI_API_KEY etc.)
+API_KEY_NAMES = ('OPENAI_API_KEY', 'SERPAPI_API_KEY', 'GEMINI_API_KEY')
+
+
+def __getattr__(name):
+    if name in API_KEY_NAMES:
+        load_env()
+        return os.getenv(name)
+    raise AttributeError(f"module 'config' has no attribute '{name}'")
+
+# Gemini model used for analysis
+GEMINI_MODEL = 'models/gemini-1.5-flash'
+STRUCTURED_OUTPUT = True  # Request schema-constrained JSON (response_schema) from Gemini
+
+# Gemini quota, enforced process-wide by rate_limiter.get_shared_limiter()
+RATE_LIMIT_RPM = 60  # Requests per minute
+RATE_LIMIT_TPM = 1000000  # Estimated prompt tokens per minute
+RATE_LIMIT_STATE_FILE = None  # e.g. '.cache/rate_limit.json' to share the quota across processes
+RETRY_BACKOFF = 1.0  # Base seconds before retrying a failed Gemini request, doubled per attempt and jittered
+
+# Async analyzer (ai_analyzer.AsyncAIAnalyzer)
+ASYNC_ANALYZER = True  # Let the app send Gemini requests through the async client
+ASYNC_MAX_IN_FLIGHT = 8  # Maximum concurrent in-flight Gemini requests
 
 # Configuration
 MAX_POSTS = 20  # Maximum number of posts to analyze
 MIN_LEAD_SCORE = 5  # Minimum lead score to consider
+ANALYSIS_WORKERS = 4  # Concurrent analysis requests in the pipeline (network-bound)
+ENRICHMENT_WORKERS = 2  # Enrichment worker processes (CPU-bound), 0 to enrich inline
+ENRICHMENT_POOL_MIN_POSTS = 50  # Smaller runs enrich inline, worker startup would cost more than it saves
+DEDUPLICATE_POSTS = True  # Analyze duplicate / near-duplicate posts once and share the result
+NEAR_DUPLICATE_THRESHOLD = 0.8  # Estimated Jaccard similarity of word shingles to count as a repost
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16  # LSH bands (MINHASH_PERMUTATIONS / MINHASH_BANDS rows each)
+SHINGLE_SIZE = 3  # Words per shingle
+PREFILTER_ENABLED = True  # Score posts locally and only send likely leads to Gemini
+PREFILTER_THRESHOLD = 2.0  # Minimum local pre-score (0-10) for a post without keyword hits to be sent to Gemini
+METRICS_ENABLED = True  # Record per-stage latency histograms (metrics.get_metrics), near-zero cost when off
+METRICS_MAX_SAMPLES = 2048  # Samples kept per stage for percentiles
+STREAM_CHUNK_SIZE = 5  # Minimum finished rows to collect before refreshing the live results table
 TECH_STACK_KEYWORDS = [
     'streamlit', 'gradio', 'flask', 'django', 'react', 'vue', 'angular',
     'node.js', 'python', 'javascript', 'typescript', 'next.js', 'tailwind',
     'bootstrap', 'material-ui'
 ]
 
+# LinkedIn search and scraping
+SEARCH_API_URL = 'https://serpapi.com/search.json'  # SerpAPI Google search, finds post URLs
+SCRAPER_WORKERS = 8  # Parallel page fetches in LinkedInScraper.fetch_posts and the pipeline
+SCRAPER_POOL_SIZE = 10  # Keep-alive connections per host in the shared session
+SCRAPER_PER_HOST_CONCURRENCY = 2  # Concurrent requests to any one host
+SCRAPER_MIN_HOST_INTERVAL = 1.0  # Minimum seconds between requests to the same host
+SCRAPER_HOST_JITTER = 1.0  # Extra random delay (seconds) added to the per-host interval
+SCRAPER_TIMEOUT = 15  # Seconds before a page fetch times out
+HTTP_CACHE_ENABLED = True  # Cache fetched pages and search results on disk
+HTTP_CACHE_PATH = os.path.join('.cache', 'http_cache.sqlite3')
+HTTP_CACHE_FRESHNESS = 15 * 60  # Seconds a cached response is used without revalidating
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Compressed bodies kept before LRU eviction
+HTML_EXTRACTOR = 'auto'  # 'auto', 'selectolax', 'strainer' (lxml + SoupStrainer) or 'full' (html.parser)
+
 # Project stages
 PROJECT_STAGES = ['idea', 'prototype', 'mvp', 'launched']
 
@@ -27,6 +78,15 @@ MISSING_FEATURES = [
     'database', 'api', 'payment integration', 'email notifications'
 ]
 
+# Scoring guidance shared by the single-post and batched prompts
+SCORING_CRITERIA = """
+Consider the following for scoring:
+- Higher score if using minimal UI tools (Streamlit, Gradio)
+- Higher score if missing critical features
+- Higher score if project shows potential for monetization
+- Higher score if project has traction (comments, likes)
+"""
+
 # GPT-4 Analysis Prompt Template
 ANALYSIS_PROMPT = """You are a product development expert. Analyze the following startup/product post.
 
@@ -41,13 +101,48 @@ Return a JSON object with the following structure:
     "potential_needs": [list of potential business needs],
     "lead_score": float between 0 and 10
 }}
+""" + SCORING_CRITERIA
 
-Consider the following for scoring:
-- Higher score if using minimal UI tools (Streamlit, Gradio)
-- Higher score if missing critical features
-- Higher score if project shows potential for monetization
-- Higher score if project has traction (comments, likes)
-"""
+# Batched Analysis Prompt Template, several posts per request
+BATCH_ANALYSIS_PROMPT = """You are a product development expert. Analyze each of the following startup/product posts independently.
+
+{posts}
+
+Return a JSON array containing one object per post with the following structure:
+[
+    {{
+        "index": the number of the post as given in [Post N],
+        "tech_stack": [list of technologies used],
+        "project_stage": "idea/prototype/mvp/launched",
+        "missing_features": [list of missing features],
+        "potential_needs": [list of potential business needs],
+        "lead_score": float between 0 and 10
+    }}
+]
+""" + SCORING_CRITERIA
+
+# Bump whenever ANALYSIS_PROMPT or BATCH_ANALYSIS_PROMPT changes so cached analyses are not reused
+PROMPT_VERSION = "1"
+
+# Sentiment analysis
+SENTIMENT_BACKEND = 'textblob'  # 'textblob' or 'lexicon' (precomputed dictionary lookup, faster cold start)
+SENTIMENT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sentiment_lexicon.json')
+SENTIMENT_WORKERS = 2  # TextBlob scoring processes for large batches
+SENTIMENT_CHUNK_SIZE = 500  # Texts per TextBlob scoring chunk
+POSITIVE_SENTIMENT_THRESHOLD = 0.3
+NEGATIVE_SENTIMENT_THRESHOLD = -0.3
+
+# Prompt compression (prompt_compression.compress_post), applied to post text before analysis
+PROMPT_COMPRESSION = True
+POST_TOKEN_BUDGET = 400  # Estimated tokens of post text allowed per post in a prompt
+HASHTAG_WALL_KEEP = 3  # Hashtags kept from a run of 4 or more (tech keyword hashtags are always kept)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'trk', 'trackingid', 'lipi', 'mc_cid', 'mc_eid', 'igshid', 'si', 'ref', 'rcm'}
+TRACKING_PARAM_PREFIXES = ('utm_', 'trk_')
+
+# Batched analysis limits
+ANALYSIS_BATCH_SIZE = 5  # Posts the pipeline groups into one analyze_batch call, 1 to disable
+MAX_BATCH_SIZE = 20  # Maximum posts packed into a single prompt
+BATCH_TOKEN_BUDGET = 6000  # Estimated prompt tokens allowed per batched request
 
 # Default analysis when AI fails
 DEFAULT_ANALYSIS = {
@@ -56,4 +151,17 @@ DEFAULT_ANALYSIS = {
     "missing_features": [],
     "potential_needs": [],
     "lead_score": 0.0
-} 
\ No newline at end of file
+}
+
+# Persistent analysis cache
+ANALYSIS_CACHE_ENABLED = True
+ANALYSIS_CACHE_PATH = os.path.join('.cache', 'analysis_cache.sqlite3')
+ANALYSIS_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds before a cached analysis expires
+ANALYSIS_CACHE_MAX_ENTRIES = 10000
+CACHE_DEFAULT_ANALYSIS = False  # Don't remember DEFAULT_ANALYSIS fallbacks from failed requests
+
+# Lead database (result_store.ResultStore)
+RESULT_STORE_ENABLED = True  # Append every finished run to the local lead database
+RESULT_STORE_PATH = 'lead_store'  # Parquet dataset directory, partitioned by run date
+RESULT_STORE_BACKEND = 'auto'  # 'duckdb' (if installed), 'pyarrow' or 'auto'
+RESULT_PAGE_SIZE = 100  # Rows per page when browsing the lead database
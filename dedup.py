@@ -0,0 +1,108 @@
+import hashlib
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional
+import numpy as np
+from config import NEAR_DUPLICATE_THRESHOLD, MINHASH_PERMUTATIONS, MINHASH_BANDS, SHINGLE_SIZE
+
+WORD_PATTERN = re.compile(r'\w+')
+MERSENNE_PRIME = (1 << 31) - 1  # Keeps a * x + b inside uint64 for 31-bit hashes
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and drop punctuation and extra whitespace."""
+    return " ".join(WORD_PATTERN.findall(text.lower()))
+
+
+def shingles(normalized: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Word n-grams of a normalized text; short texts are a single shingle."""
+    words = normalized.split()
+    if len(words) <= size:
+        return [normalized]
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class Deduplicator:
+    """Incremental exact and near-duplicate detector for post texts.
+
+    Exact duplicates are found by a hash of the normalized text. Near
+    duplicates use MinHash signatures over word shingles, bucketed with LSH
+    banding so each new text is only compared with the few earlier texts that
+    share a band, keeping large batches sub-quadratic. Candidates count as
+    duplicates when their estimated Jaccard similarity reaches threshold.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD, num_perm: int = MINHASH_PERMUTATIONS,
+                 bands: int = MINHASH_BANDS, shingle_size: int = SHINGLE_SIZE, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        self._exact: Dict[str, Hashable] = {}
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self._buckets: Dict[tuple, List[Hashable]] = defaultdict(list)
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+
+    def signature(self, normalized: str) -> np.ndarray:
+        """MinHash signature of a normalized text."""
+        hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little') % MERSENNE_PRIME
+             for s in shingles(normalized, self.shingle_size)],
+            dtype=np.uint64
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def add(self, key: Hashable, text: str) -> Optional[Hashable]:
+        """Register a text under key.
+
+        Returns the key of the earlier text it duplicates, or None when it is
+        new (it then becomes the representative for later duplicates).
+        """
+        normalized = normalize_text(text)
+        digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        if digest in self._exact:
+            self.exact_duplicates += 1
+            return self._exact[digest]
+
+        signature = self.signature(normalized)
+        band_keys = [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+        best, best_similarity = None, self.threshold
+        seen = set()
+        for band_key in band_keys:
+            for candidate in self._buckets.get(band_key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+        if best is not None:
+            self.near_duplicates += 1
+            return best
+
+        self._exact[digest] = key
+        self._signatures[key] = signature
+        for band_key in band_keys:
+            self._buckets[band_key].append(key)
+        return None
+
+
+def group_duplicates(texts: List[str], **kwargs) -> List[int]:
+    """Map every text index to the index of its representative (itself when unique)."""
+    deduplicator = Deduplicator(**kwargs)
+    groups = []
+    for i, text in enumerate(texts):
+        representative = deduplicator.add(i, text)
+        groups.append(i if representative is None else representative)
+    return groups
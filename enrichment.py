@@ -1,53 +1,75 @@
-import requests
-from bs4 import BeautifulSoup
-from email_validator import validate_email, EmailNotValidError
-from textblob import TextBlob
-import tldextract
-from typing import Dict, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional
 import re
+from sentiment import SentimentBackend, get_sentiment_backend
+from metrics import get_metrics
+
+metrics = get_metrics()
+
+# Patterns are compiled once at import rather than on every call. Each is one
+# capturing group, so enrich_frame can pass them to str.extract as they are
+URL_PATTERN = re.compile(r'(https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+)')
+EMAIL_PATTERN = re.compile(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')
+
+# Engagement indicators by category
+TRACTION_INDICATORS = {
+    "feedback": ["feedback", "comments", "thoughts", "suggestions"],
+    "collaboration": ["collaborate", "partner", "join", "team up"],
+    "launch": ["launched", "live", "released", "published"],
+    "growth": ["growing", "users", "customers", "revenue"]
+}
+
+# One precompiled alternation per category, used for vectorized matching in enrich_frame
+TRACTION_PATTERNS = {
+    category: re.compile("|".join(re.escape(word) for word in words))
+    for category, words in TRACTION_INDICATORS.items()
+}
+
+
+@lru_cache(maxsize=4096)
+def _validate_email(email: str) -> Optional[str]:
+    """Validate an email address once per distinct address."""
+    from email_validator import validate_email, EmailNotValidError
+    try:
+        return validate_email(email).email
+    except EmailNotValidError:
+        return None
+
 
 class PostEnricher:
-    def __init__(self):
+    def __init__(self, sentiment_backend: Optional[SentimentBackend] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        # Backend selected by config.SENTIMENT_BACKEND unless one is given
+        self.sentiment_backend = sentiment_backend or get_sentiment_backend()
 
     def extract_website(self, text: str) -> Optional[str]:
         """Extract website URL from text."""
         # Look for common URL patterns
-        url_pattern = r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+'
-        urls = re.findall(url_pattern, text)
+        match = URL_PATTERN.search(text)
         
-        if urls:
-            return urls[0]
+        if match:
+            return match.group(0)
         return None
 
     def extract_email(self, text: str) -> Optional[str]:
         """Extract email address from text."""
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        emails = re.findall(email_pattern, text)
+        match = EMAIL_PATTERN.search(text)
         
-        if emails:
-            try:
-                validated_email = validate_email(emails[0])
-                return validated_email.email
-            except EmailNotValidError:
-                return None
+        if match:
+            return _validate_email(match.group(0))
         return None
 
     def analyze_sentiment(self, text: str) -> Tuple[float, str]:
-        """Analyze sentiment of text using TextBlob."""
-        analysis = TextBlob(text)
-        score = analysis.sentiment.polarity
-        
-        if score > 0.3:
-            sentiment = "Positive"
-        elif score < -0.3:
-            sentiment = "Negative"
-        else:
-            sentiment = "Neutral"
-            
-        return score, sentiment
+        """Analyze sentiment of text using the configured sentiment backend."""
+        return self.sentiment_backend.analyze(text)
+
+    def analyze_sentiment_many(self, texts: List[str]) -> List[Tuple[float, str]]:
+        """Analyze sentiment of many texts, scoring each distinct text once."""
+        distinct = list(set(texts))
+        scored = dict(zip(distinct, self.sentiment_backend.analyze_many(distinct)))
+        return [scored[text] for text in texts]
 
     def analyze_traction(self, text: str) -> Dict:
         """Analyze post traction based on engagement indicators."""
@@ -57,15 +79,8 @@ class PostEnricher:
         }
         
         # Check for engagement indicators
-        indicators = {
-            "feedback": ["feedback", "comments", "thoughts", "suggestions"],
-            "collaboration": ["collaborate", "partner", "join", "team up"],
-            "launch": ["launched", "live", "released", "published"],
-            "growth": ["growing", "users", "customers", "revenue"]
-        }
-        
         text_lower = text.lower()
-        for category, words in indicators.items():
+        for category, words in TRACTION_INDICATORS.items():
             if any(word in text_lower for word in words):
                 traction["engagement_score"] += 1
                 traction["engagement_indicators"].append(category)
@@ -77,14 +92,18 @@ class PostEnricher:
         enriched_data = post_data.copy()
         
         # Extract website and email
-        website = self.extract_website(post_data["Post Text"])
-        email = self.extract_email(post_data["Post Text"])
+        with metrics.timer("enricher.website"):
+            website = self.extract_website(post_data["Post Text"])
+        with metrics.timer("enricher.email"):
+            email = self.extract_email(post_data["Post Text"])
         
         # Analyze sentiment
-        sentiment_score, sentiment = self.analyze_sentiment(post_data["Post Text"])
+        with metrics.timer("enricher.sentiment"):
+            sentiment_score, sentiment = self.analyze_sentiment(post_data["Post Text"])
         
         # Analyze traction
-        traction = self.analyze_traction(post_data["Post Text"])
+        with metrics.timer("enricher.traction"):
+            traction = self.analyze_traction(post_data["Post Text"])
         
         # Add enriched data
         enriched_data.update({
@@ -96,4 +115,45 @@ class PostEnricher:
             "Engagement Indicators": ", ".join(traction["engagement_indicators"])
         })
         
-        return enriched_data 
\ No newline at end of file
+        return enriched_data
+
+    def enrich_frame(self, df):
+        """Enrich a whole DataFrame of results at once.
+
+        Produces the same columns and values as applying enrich_post to every row,
+        but extracts websites and emails with vectorized str.extract, validates
+        each distinct email once and matches each traction category with one
+        vectorized regex pass over the whole column.
+
+        Meant for re-enriching an existing results frame. PostPipeline, and so
+        the app and batch runner, enrich each post as it finishes with
+        enrich_post: benchmarks/bench_enrichment.py puts enrich_frame at only
+        1.1-1.6x faster for 1k-5k posts (sentiment scoring dominates both
+        paths) and slower on small frames.
+        """
+        enriched = df.copy()
+        text = df["Post Text"]
+
+        website = text.str.extract(URL_PATTERN, expand=False)
+        email = text.str.extract(EMAIL_PATTERN, expand=False)
+        email = email.map(lambda address: _validate_email(address) if isinstance(address, str) else None)
+
+        sentiments = self.analyze_sentiment_many(text.tolist())
+
+        text_lower = text.str.lower()
+        matches = {
+            category: text_lower.str.contains(pattern, regex=True).tolist()
+            for category, pattern in TRACTION_PATTERNS.items()
+        }
+        categories = [
+            [category for category in TRACTION_INDICATORS if matches[category][row]]
+            for row in range(len(df))
+        ]
+
+        enriched["Website"] = website.astype(object).where(website.notna(), None)
+        enriched["Email"] = email.astype(object).where(email.notna(), None)
+        enriched["Sentiment Score"] = [round(score, 2) for score, _ in sentiments]
+        enriched["Sentiment"] = [sentiment for _, sentiment in sentiments]
+        enriched["Engagement Score"] = [len(found) for found in categories]
+        enriched["Engagement Indicators"] = [", ".join(found) for found in categories]
+        return enriched
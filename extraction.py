@@ -0,0 +1,144 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+from config import HTML_EXTRACTOR
+
+try:
+    import lxml  # noqa: F401
+    SOUP_PARSER = 'lxml'
+except ImportError:
+    SOUP_PARSER = 'html.parser'
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser  # selectolax < 1.0
+    except ImportError:
+        HTMLParser = None
+
+# CSS classes holding each post field, in order of preference
+FIELD_CLASSES = {
+    'text': ['feed-shared-update-v2__description', 'attributed-text-segment-list__content'],
+    'author': ['update-components-actor__name', 'feed-shared-actor__name'],
+    'date': ['update-components-actor__sub-description', 'feed-shared-actor__sub-description'],
+    'reactions': ['social-details-social-counts__reactions-count']
+}
+
+# Matches a class attribute containing any target class, whether bs4 tests it whole or per class
+TARGET_CLASS_PATTERN = re.compile(
+    r'(?:^|\s)(?:' + '|'.join(re.escape(name) for names in FIELD_CLASSES.values() for name in names) + r')(?:$|\s)'
+)
+COUNT_PATTERN = re.compile(r'([\d.,]+)\s*([KkMm]?)')
+
+
+def parse_count(text: Optional[str]) -> Optional[int]:
+    """Parse a reaction count such as '1,234' or '1.2K'."""
+    if not text:
+        return None
+    match = COUNT_PATTERN.search(text)
+    if not match:
+        return None
+    number, suffix = match.groups()
+    try:
+        value = float(number.replace(',', ''))
+    except ValueError:
+        return None
+    multiplier = {'k': 1000, 'm': 1000000}.get(suffix.lower(), 1)
+    return int(value * multiplier)
+
+
+def clean_date(text: Optional[str]) -> str:
+    """Keep the relative timestamp from an actor sub-description ('2d • Edited •' -> '2d')."""
+    if not text:
+        return ''
+    return text.split('•')[0].strip()
+
+
+class PostExtractor(ABC):
+    """Extracts post text, author, date and reaction count from a post page in one parse."""
+
+    name = ""
+
+    @abstractmethod
+    def _field_texts(self, html: str) -> Dict[str, Optional[str]]:
+        """Raw text of each FIELD_CLASSES field, None where the page has none."""
+
+    def extract(self, html: str) -> Optional[Dict]:
+        """Post fields, or None when the page has no post text."""
+        fields = self._field_texts(html)
+        if not fields.get('text'):
+            return None
+        return {
+            'text': fields['text'],
+            'author': fields.get('author') or '',
+            'date': clean_date(fields.get('date')),
+            'reactions': parse_count(fields.get('reactions'))
+        }
+
+
+class FullSoupExtractor(PostExtractor):
+    """Parses the whole page with BeautifulSoup's pure-Python html.parser (the original path)."""
+
+    name = "full"
+
+    def _find(self, soup, classes: List[str]) -> Optional[str]:
+        for class_name in classes:
+            element = soup.find(class_=class_name)
+            if element:
+                return element.get_text(strip=True)
+        return None
+
+    def _field_texts(self, html: str) -> Dict[str, Optional[str]]:
+        soup = BeautifulSoup(html, 'html.parser')
+        return {field: self._find(soup, classes) for field, classes in FIELD_CLASSES.items()}
+
+
+class SoupStrainerExtractor(FullSoupExtractor):
+    """Builds only the target subtrees, using lxml when installed."""
+
+    name = "strainer"
+
+    def __init__(self):
+        self.strainer = SoupStrainer(class_=TARGET_CLASS_PATTERN)
+
+    def _field_texts(self, html: str) -> Dict[str, Optional[str]]:
+        soup = BeautifulSoup(html, SOUP_PARSER, parse_only=self.strainer)
+        return {field: self._find(soup, classes) for field, classes in FIELD_CLASSES.items()}
+
+
+class SelectolaxExtractor(PostExtractor):
+    """Uses selectolax's C HTML parser and CSS selectors."""
+
+    name = "selectolax"
+
+    def _field_texts(self, html: str) -> Dict[str, Optional[str]]:
+        tree = HTMLParser(html)
+        fields = {}
+        for field, classes in FIELD_CLASSES.items():
+            fields[field] = None
+            for class_name in classes:
+                node = tree.css_first('.' + class_name)
+                if node is not None:
+                    fields[field] = node.text(strip=True)
+                    break
+        return fields
+
+
+EXTRACTORS = {
+    FullSoupExtractor.name: FullSoupExtractor,
+    SoupStrainerExtractor.name: SoupStrainerExtractor,
+    SelectolaxExtractor.name: SelectolaxExtractor
+}
+
+
+def get_extractor(name: str = HTML_EXTRACTOR) -> PostExtractor:
+    """Extractor by name; 'auto' prefers selectolax, then the SoupStrainer fast path."""
+    if name == 'auto':
+        name = SelectolaxExtractor.name if HTMLParser is not None else SoupStrainerExtractor.name
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown HTML extractor {name!r}, expected 'auto' or one of {sorted(EXTRACTORS)}")
+    if name == SelectolaxExtractor.name and HTMLParser is None:
+        raise ImportError("selectolax is not installed")
+    return EXTRACTORS[name]()
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlencode
+from config import HTTP_CACHE_PATH, HTTP_CACHE_FRESHNESS, HTTP_CACHE_MAX_BYTES
+
+
+class CachedResponse(NamedTuple):
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    raw_size: int
+
+
+def cache_key(url: str, params: Optional[Dict] = None) -> str:
+    """Cache key for a GET request. API keys are left out so they are never written to disk."""
+    if not params:
+        return url
+    query = urlencode(sorted((k, v) for k, v in params.items() if k != 'api_key'))
+    return f"{url}?{query}"
+
+
+class HTTPCache:
+    """Disk-backed cache of GET response bodies with their validators.
+
+    Bodies are stored zlib-compressed in SQLite. Entries younger than freshness
+    seconds are served without touching the network; older ones are revalidated
+    with If-None-Match / If-Modified-Since. The least recently used entries are
+    evicted once the compressed bodies exceed max_bytes.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, freshness: float = HTTP_CACHE_FRESHNESS,
+                 max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.freshness = freshness
+        self.max_bytes = max_bytes
+        self.hits = 0  # Served fresh from the cache
+        self.revalidated = 0  # Server answered 304 Not Modified
+        self.misses = 0
+        self.bytes_saved = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, raw_size INTEGER NOT NULL, "
+                "etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        """Stored response for a key, fresh or stale, or None."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at, raw_size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        body, etag, last_modified, fetched_at, raw_size = row
+        return CachedResponse(zlib.decompress(body).decode('utf-8'), etag, last_modified, fetched_at, raw_size)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.fetched_at < self.freshness
+
+    def conditional_headers(self, entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """Validator headers for revalidating a stale entry."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def record_hit(self, entry: CachedResponse):
+        """Count a fresh entry served without a request."""
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += entry.raw_size
+
+    def record_not_modified(self, key: str, entry: CachedResponse):
+        """Count a 304 and restart the entry's freshness window."""
+        with self._lock, self._conn:
+            self.revalidated += 1
+            self.bytes_saved += entry.raw_size
+            self._conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+
+    def store(self, key: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a full response, counting it as a miss, and evict to stay under max_bytes."""
+        raw = body.encode('utf-8')
+        compressed = zlib.compress(raw, 6)
+        now = time.time()
+        with self._lock, self._conn:
+            self.misses += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, body, size, raw_size, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), len(raw), etag, last_modified, now, now)
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def stats(self) -> Dict:
+        """Hit/revalidation/miss counters, hit rate and bytes saved."""
+        with self._lock:
+            size, count = self._conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses").fetchone()
+            requests_seen = self.hits + self.revalidated + self.misses
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.revalidated) / requests_seen if requests_seen else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "entries": count,
+                "stored_bytes": size
+            }
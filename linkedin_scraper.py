@@ -1,41 +1,193 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from extraction import PostExtractor, get_extractor
+from http_cache import HTTPCache, cache_key
+from metrics import get_metrics
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import json
+import threading
 import time
 import random
+import config
+from config import (SEARCH_API_URL, MAX_POSTS, SCRAPER_WORKERS, SCRAPER_POOL_SIZE,
+                    SCRAPER_PER_HOST_CONCURRENCY, SCRAPER_MIN_HOST_INTERVAL, SCRAPER_HOST_JITTER,
+                    SCRAPER_TIMEOUT, HTTP_CACHE_ENABLED)
+
+metrics = get_metrics()
+
+
+class HostThrottle:
+    """Per-host concurrency cap and minimum spacing between requests to the same host."""
+
+    def __init__(self, max_concurrency: int = SCRAPER_PER_HOST_CONCURRENCY,
+                 min_interval: float = SCRAPER_MIN_HOST_INTERVAL, jitter: float = SCRAPER_HOST_JITTER):
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._next_request: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, host: str):
+        """Hold one of the host's concurrency slots, waiting out its politeness delay"""
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.Semaphore(self.max_concurrency))
+        with semaphore:
+            with self._lock:
+                now = time.time()
+                start = max(now, self._next_request.get(host, 0.0))
+                self._next_request[host] = start + self.min_interval + random.uniform(0, self.jitter)
+            if start > now:
+                time.sleep(start - now)
+            metrics.record("scraper.throttle_wait", max(0.0, start - now))
+            yield
+
 
 class LinkedInScraper:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None, max_posts: int = MAX_POSTS,
+                 extractor: Optional[PostExtractor] = None, http_cache: Optional[HTTPCache] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.min_delay = 2
-        self.max_delay = 5
+        self.max_posts = max_posts
+        self.timeout = SCRAPER_TIMEOUT
+        self.throttle = HostThrottle()
+        self.extractor = extractor or get_extractor()
+        if http_cache is None and HTTP_CACHE_ENABLED:
+            http_cache = HTTPCache()
+        self.http_cache = http_cache
+        self.session = session or self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        """Shared keep-alive session with a pooled adapter and retries on transient errors"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=SCRAPER_POOL_SIZE, pool_maxsize=SCRAPER_POOL_SIZE, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the pooled session, respecting per-host politeness limits"""
+        with self.throttle.slot(urlparse(url).netloc):
+            with metrics.timer("scraper.request"):
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def _fetch_text(self, url: str, params: Optional[dict] = None) -> str:
+        """GET a response body, served from or revalidated against the HTTP cache when enabled"""
+        if self.http_cache is None:
+            return self._get(url, params=params).text
+
+        key = cache_key(url, params)
+        entry = self.http_cache.lookup(key)
+        if entry is not None and self.http_cache.is_fresh(entry):
+            self.http_cache.record_hit(entry)
+            metrics.increment("scraper.cache_hits")
+            return entry.body
+
+        response = self._get(url, params=params, headers=self.http_cache.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            self.http_cache.record_not_modified(key, entry)
+            metrics.increment("scraper.not_modified")
+            return entry.body
 
-    def _add_delay(self):
-        """Add random delay between requests"""
-        delay = random.uniform(self.min_delay, self.max_delay)
-        time.sleep(delay)
+        self.http_cache.store(key, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.text
 
     def scrape_post(self, url: str) -> dict:
         """Scrape a LinkedIn post URL"""
         try:
-            self._add_delay()
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
+            html = self._fetch_text(url)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract post text
-            post_text = soup.find('div', {'class': 'feed-shared-update-v2__description'})
-            if post_text:
-                post_text = post_text.get_text(strip=True)
-            else:
+            # Extract post text, author, date and reactions in a single parse
+            with metrics.timer("scraper.parse"):
+                post = self.extractor.extract(html)
+            if not post:
                 return None
             
-            return {
-                'text': post_text,
-                'url': url
-            }
+            post['url'] = url
+            return post
             
         except Exception as e:
-            return None 
\ No newline at end of file
+            return None
+
+    def fetch_posts(self, urls: List[str]) -> List[Optional[dict]]:
+        """Scrape several post URLs in parallel, results in input order"""
+        with ThreadPoolExecutor(max_workers=SCRAPER_WORKERS) as pool:
+            return list(pool.map(self.scrape_post, urls))
+
+    def _build_query(self, keywords: str, tags: str = "") -> str:
+        tag_terms = [tag.strip() for tag in tags.replace(",", " ").split() if tag.strip()]
+        return " ".join(["site:linkedin.com/posts", f'"{keywords.strip()}"'] + tag_terms)
+
+    def _search_api_key(self) -> str:
+        api_key = config.SERPAPI_API_KEY
+        if not api_key:
+            raise ValueError("SERPAPI_API_KEY not found in environment variables")
+        return api_key
+
+    def search_posts(self, keywords: str, tags: str = "") -> List[dict]:
+        """Find LinkedIn post URLs matching keywords and optional tags.
+
+        Uses SerpAPI's Google engine, returns at most max_posts search hits of
+        the form {'url', 'snippet', 'date'}. Post pages are fetched later by
+        extract_post_data, so the pipeline can fetch them concurrently.
+        """
+        api_key = self._search_api_key()
+        query = self._build_query(keywords, tags)
+        posts, seen = [], set()
+        start = 0
+        for _ in range(10):  # Google stops returning new results after a few pages
+            if len(posts) >= self.max_posts:
+                break
+            response_text = self._fetch_text(SEARCH_API_URL, params={
+                'engine': 'google',
+                'q': query,
+                'api_key': api_key,
+                'num': min(100, self.max_posts),
+                'start': start
+            })
+            results = json.loads(response_text).get('organic_results', [])
+            if not results:
+                break
+            for result in results:
+                url = result.get('link')
+                if not url or url in seen or '/posts/' not in url:
+                    continue
+                seen.add(url)
+                posts.append({
+                    'url': url,
+                    'snippet': result.get('snippet', ''),
+                    'date': result.get('date', '')
+                })
+                if len(posts) >= self.max_posts:
+                    break
+            start += len(results)
+
+        return posts
+
+    def extract_post_data(self, post: dict) -> dict:
+        """Fetch a search hit's post page and return its post_* fields.
+
+        Falls back to the search snippet when the page cannot be scraped.
+        """
+        post_url = post.get('url', '')
+        scraped = self.scrape_post(post_url) if post_url else None
+        if not scraped:
+            scraped = {'text': post.get('snippet', ''), 'author': '', 'date': '', 'reactions': None}
+        return {
+            'post_text': scraped['text'],
+            'post_url': post_url,
+            'post_date': scraped['date'] or post.get('date', ''),
+            'post_author': scraped['author'],
+            'post_reactions': scraped['reactions']
+        }
@@ -0,0 +1,194 @@
+import cProfile
+import io
+import json
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from config import METRICS_ENABLED, METRICS_MAX_SAMPLES
+
+
+class Histogram:
+    """Count, total and a bounded reservoir sample of durations for percentiles."""
+
+    def __init__(self, max_samples: int = METRICS_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling keeps the sample uniform over every recorded value
+            slot = random.randrange(self.count)
+            if slot < self.max_samples:
+                self.samples[slot] = seconds
+
+    def percentile(self, ordered: List[float], q: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(ordered, 0.50) * 1000,
+            "p95_ms": self.percentile(ordered, 0.95) * 1000,
+            "p99_ms": self.percentile(ordered, 0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class _NullTimer:
+    """Shared no-op context manager returned while metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Named latency histograms and counters for the scraper, analyzer, enricher and pipeline.
+
+    Stage names are dotted, e.g. "scraper.request" or "pipeline.analyze". While
+    disabled, timer() returns a shared no-op and record()/increment() return
+    immediately, so instrumented code pays only an attribute check. Timings
+    recorded inside enrichment worker processes stay in those processes; the
+    pipeline records the enrich stage as a whole in the parent.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+
+    def timer(self, name: str):
+        """Context manager timing its block into the named histogram."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def record(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def increment(self, name: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict:
+        """{"timings": {stage: summary}, "counters": {name: count}}"""
+        with self._lock:
+            return {
+                "timings": {name: histogram.summary() for name, histogram in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self, **extra) -> str:
+        return json.dumps({**self.snapshot(), **extra}, indent=2, default=str)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide registry used by every instrumented component."""
+    return _metrics
+
+
+class ProfileCapture:
+    """Result of a profile() block."""
+
+    def __init__(self):
+        self.stats: Optional[pstats.Stats] = None
+        self.allocations: List[tracemalloc.Statistic] = []
+        self.peak_memory = 0
+
+    def stats_text(self, limit: int = 30, sort: str = "cumulative") -> str:
+        if self.stats is None:
+            return ""
+        stream = io.StringIO()
+        self.stats.stream = stream
+        self.stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def allocations_text(self, limit: int = 20) -> str:
+        return "\n".join(str(statistic) for statistic in self.allocations[:limit])
+
+    def dump(self, pstats_path: str):
+        """Save the cProfile data for snakeviz, pstats and similar tools."""
+        if self.stats is not None:
+            self.stats.dump_stats(pstats_path)
+
+
+@contextmanager
+def profile(cpu: bool = True, memory: bool = True):
+    """Capture a cProfile and/or tracemalloc profile of the block.
+
+    cProfile only sees the thread that entered the block (for the pipeline,
+    the coordinator); tracemalloc covers allocations from every thread.
+    """
+    capture = ProfileCapture()
+    profiler = cProfile.Profile() if cpu else None
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield capture
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            capture.stats = pstats.Stats(profiler)
+        if memory:
+            capture.peak_memory = tracemalloc.get_traced_memory()[1]
+            capture.allocations = tracemalloc.take_snapshot().statistics("lineno")
+            if started_tracing:
+                tracemalloc.stop()
@@ -0,0 +1,334 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import config
+from dedup import Deduplicator
+from metrics import get_metrics
+from prefilter import PreScorer
+
+metrics = get_metrics()
+
+_enrichment_pools: Dict[int, ProcessPoolExecutor] = {}
+_enrichment_pools_lock = threading.Lock()
+
+
+def build_result(post_data: Dict, analysis: Dict) -> Dict:
+    """Combine scraped post data and AI analysis into a result row."""
+    # Use .get() with default values to handle potential missing keys
+    return {
+        "Post Text": post_data.get("post_text", ""),
+        "Post URL": post_data.get("post_url", ""),
+        "Post Date": post_data.get("post_date", ""),
+        "Author": post_data.get("post_author", ""),
+        "Reactions": post_data.get("post_reactions"),
+        "Tech Stack": ", ".join(analysis.get("tech_stack", [])),
+        "Project Stage": analysis.get("project_stage", "unknown"),
+        "Missing Features": ", ".join(analysis.get("missing_features", [])),
+        "Potential Needs": ", ".join(analysis.get("potential_needs", [])),
+        "Suggested Services": ", ".join(analysis.get("suggested_services", [])),
+        "Lead Score": float(analysis.get("lead_score", 0.0))  # Ensure lead score is float
+    }
+
+
+def build_error_result(post_data: Dict) -> Dict:
+    """Placeholder row that keeps the table structure when analysis fails."""
+    return {
+        "Post Text": post_data.get("post_text", ""),
+        "Post URL": post_data.get("post_url", ""),
+        "Post Date": post_data.get("post_date", ""),
+        "Author": post_data.get("post_author", ""),
+        "Reactions": post_data.get("post_reactions"),
+        "Tech Stack": "Error",
+        "Project Stage": "Error",
+        "Missing Features": "Error",
+        "Potential Needs": "Error",
+        "Suggested Services": "Error",
+        "Lead Score": 0.0  # Assign a low score on error
+    }
+
+
+def get_enrichment_pool(workers: int, broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+    """Process-wide enrichment pool of the given size, reused by every run.
+
+    Starting a worker costs a fresh interpreter and its imports, far more than
+    enriching a post, so pools outlive the runs that use them. Pass a pool
+    that raised BrokenProcessPool (a worker died) as broken to replace it;
+    if another caller already replaced it, the replacement is returned.
+    """
+    with _enrichment_pools_lock:
+        pool = _enrichment_pools.get(workers)
+        if pool is None or pool is broken:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            # Spawn rather than fork: the parent already has analysis threads running
+            pool = _enrichment_pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+
+def shutdown_enrichment_pools():
+    """Stop every shared enrichment pool and wait for its workers to exit."""
+    with _enrichment_pools_lock:
+        pools = list(_enrichment_pools.values())
+        _enrichment_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class PostPipeline:
+    """Run the fetch, analyze and enrich stages concurrently over a batch of posts.
+
+    Fetching and AI analysis are network-bound and run in separate thread
+    pools, so analysis batches never queue behind outstanding fetches (with
+    an AsyncAIAnalyzer, batches run as coroutines on its event loop instead);
+    enrichment is CPU-bound and runs in a shared process pool (or inline when
+    enrichment_workers is 0 or the run has fewer than
+    config.ENRICHMENT_POOL_MIN_POSTS posts). Fetched posts are grouped into
+    batches of batch_size for AIAnalyzer.analyze_batch. With deduplicate,
+    exact and near duplicate posts are analyzed once and the analysis is
+    fanned out to every copy. With prefilter, posts whose local PreScorer
+    score is below config.PREFILTER_THRESHOLD get a locally derived analysis
+    instead of an AI call. A post whose fetch or enrichment fails gets an
+    error row and an entry in errors. iter_results streams rows as they
+    finish; run collects them in input order.
+    """
+
+    def __init__(self, scraper, analyzer, enricher=None,
+                 analysis_workers: int = config.ANALYSIS_WORKERS,
+                 fetch_workers: int = config.SCRAPER_WORKERS,
+                 enrichment_workers: int = config.ENRICHMENT_WORKERS,
+                 batch_size: int = config.ANALYSIS_BATCH_SIZE,
+                 deduplicate: bool = config.DEDUPLICATE_POSTS,
+                 prefilter: bool = config.PREFILTER_ENABLED):
+        self.scraper = scraper
+        self.analyzer = analyzer
+        self.enricher = enricher
+        self.analysis_workers = max(1, analysis_workers)
+        self.fetch_workers = max(1, fetch_workers)
+        self.enrichment_workers = max(0, enrichment_workers)
+        self.batch_size = max(1, batch_size)
+        self.deduplicate = deduplicate
+        self.prescorer = PreScorer() if prefilter else None
+        self.duplicates_skipped = 0  # Posts whose analysis was shared from a duplicate in the last run
+        self.prefiltered = 0  # Posts analyzed locally instead of by the AI analyzer in the last run
+        self.errors: List[str] = []
+        self._cancelled = threading.Event()
+
+    def _fetch(self, post) -> Dict:
+        """Fetch stage for one post."""
+        with metrics.timer("pipeline.fetch"):
+            return self.scraper.extract_post_data(post)
+
+    def _analyze(self, batch: List[Dict]) -> List[tuple]:
+        """Analyze stage for a batch of fetched posts, returns (analysis, error) pairs."""
+        # Ensure post_text is a string before passing to analyzer
+        texts = [str(post_data.get("post_text", "")) for post_data in batch]
+        try:
+            with metrics.timer("pipeline.analyze"):
+                if len(batch) > 1:
+                    analyses = self.analyzer.analyze_batch(texts)
+                else:
+                    analyses = [self.analyzer.analyze_post(texts[0])]
+            return [(self.analyzer.enrich_analysis(analysis), None) for analysis in analyses]
+        except Exception as e:
+            return self._analysis_errors(batch, e)
+
+    async def _analyze_async(self, batch: List[Dict]) -> List[tuple]:
+        """_analyze for analyzers with an event loop (AsyncAIAnalyzer), runs on that loop."""
+        texts = [str(post_data.get("post_text", "")) for post_data in batch]
+        try:
+            with metrics.timer("pipeline.analyze"):
+                analyses = await self.analyzer.analyze_batch_async(texts)
+            return [(self.analyzer.enrich_analysis(analysis), None) for analysis in analyses]
+        except Exception as e:
+            return self._analysis_errors(batch, e)
+
+    def _analysis_errors(self, batch: List[Dict], error: Exception) -> List[tuple]:
+        return [
+            (None, f"Error analyzing post \"{post_data.get('post_text', '...')[:50]}...\": {str(error)}")
+            for post_data in batch
+        ]
+
+    def _submit_analysis(self, pool: ThreadPoolExecutor, batch: List[Dict]):
+        """Start analyzing a batch, on the analyzer's event loop when it has one."""
+        if hasattr(self.analyzer, "analyze_batch_async"):
+            # No thread waits on the request, so up to the analyzer's max_in_flight can be outstanding
+            return self.analyzer.submit(self._analyze_async(batch))
+        return pool.submit(self._analyze, batch)
+
+    def _enrichment_pool(self, total: int) -> Optional[ProcessPoolExecutor]:
+        if self.enricher is None or self.enrichment_workers == 0 or total < config.ENRICHMENT_POOL_MIN_POSTS:
+            return None
+        return get_enrichment_pool(self.enrichment_workers)
+
+    def _submit_enrichment(self, pool: ProcessPoolExecutor, row: Dict):
+        """Submit a row to the shared enrichment pool, replacing the pool once if it is broken.
+
+        Returns the pool the row went to and its future.
+        """
+        try:
+            return pool, pool.submit(self.enricher.enrich_post, row)
+        except BrokenProcessPool:
+            pool = get_enrichment_pool(self.enrichment_workers, broken=pool)
+            return pool, pool.submit(self.enricher.enrich_post, row)
+
+    def _enrichment_error(self, post_data: Dict, error: Exception) -> Dict:
+        """Record a failed enrichment and return the post's error row."""
+        self.errors.append(f"Error enriching post \"{post_data.get('post_text', '...')[:50]}...\": {str(error)}")
+        return build_error_result(post_data)
+
+    def cancel(self):
+        """Stop a running iter_results/run; unfinished posts are dropped."""
+        self._cancelled.set()
+
+    def iter_results(self, posts: List,
+                     on_progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Tuple[int, Dict]]:
+        """Process posts and yield (index, row) for each post as soon as it finishes.
+
+        Rows arrive in completion order; index is the post's position in posts.
+        on_progress is called as on_progress(completed, total) each time a post
+        has finished every stage. Calling cancel() or closing the generator
+        stops the run without waiting for in-flight requests.
+        """
+        self.errors = []
+        self.duplicates_skipped = 0
+        self.prefiltered = 0
+        self._cancelled.clear()
+        total = len(posts)
+        post_data: List[Optional[Dict]] = [None] * total
+        completed = 0
+
+        deduplicator = Deduplicator() if self.deduplicate else None
+        analyses: Dict[int, tuple] = {}  # Representative index -> (analysis, error)
+        duplicates: Dict[int, List[int]] = {}  # Representative index -> duplicate indices waiting on it
+
+        started = time.perf_counter()
+        enrich_started: Dict[int, float] = {}
+        enrich_jobs: Dict[int, Tuple[ProcessPoolExecutor, Dict]] = {}  # Post index -> (pool, submitted row)
+        enrich_retried = set()  # Posts already resubmitted after a worker died
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        analysis_pool = ThreadPoolExecutor(max_workers=self.analysis_workers)
+        enrichment_pool = self._enrichment_pool(total)
+        pending: Dict = {}  # Future -> (stage, post indices)
+        try:
+            for i, post in enumerate(posts):
+                pending[fetch_pool.submit(self._fetch, post)] = ("fetch", [i])
+            fetched: List[int] = []
+            fetches_left = total
+            while pending and not self._cancelled.is_set():
+                # Time out periodically so cancel() is noticed during long requests
+                done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                analyzed: List[Tuple[int, tuple]] = []
+                finished: List[Tuple[int, Dict]] = []
+                for future in done:
+                    stage, indices = pending.pop(future)
+                    if stage == "fetch":
+                        i = indices[0]
+                        fetches_left -= 1
+                        try:
+                            post_data[i] = future.result()
+                        except Exception as e:
+                            # Nothing to analyze, the post becomes an error row
+                            post_data[i] = {}
+                            analyses[i] = (None, f"Error fetching post {i + 1}: {str(e)}")
+                            analyzed.append((i, analyses[i]))
+                        else:
+                            representative = None
+                            if deduplicator is not None:
+                                representative = deduplicator.add(i, str(post_data[i].get("post_text", "")))
+                            if representative is None:
+                                local_analysis = None
+                                if self.prescorer is not None:
+                                    local_analysis = self.prescorer.screen(str(post_data[i].get("post_text", "")))
+                                if local_analysis is None:
+                                    fetched.append(i)
+                                else:
+                                    self.prefiltered += 1
+                                    metrics.increment("pipeline.prefiltered")
+                                    analyses[i] = (local_analysis, None)
+                                    analyzed.append((i, analyses[i]))
+                            elif representative in analyses:
+                                analyzed.append((i, analyses[representative]))
+                            else:
+                                duplicates.setdefault(representative, []).append(i)
+                        if fetched and (len(fetched) >= self.batch_size or fetches_left == 0):
+                            batch = [post_data[i] for i in fetched]
+                            pending[self._submit_analysis(analysis_pool, batch)] = ("analyze", fetched)
+                            fetched = []
+                    elif stage == "analyze":
+                        for i, outcome in zip(indices, future.result()):
+                            analyses[i] = outcome
+                            analyzed.append((i, outcome))
+                            analyzed.extend((j, outcome) for j in duplicates.pop(i, []))
+                    else:
+                        i = indices[0]
+                        metrics.record("pipeline.enrich", time.perf_counter() - enrich_started.pop(i))
+                        pool, row = enrich_jobs.pop(i)
+                        try:
+                            finished.append((i, future.result()))
+                        except BrokenProcessPool as e:
+                            # A worker died, taking every post queued on its pool with it;
+                            # each is retried once on a fresh pool
+                            enrichment_pool = get_enrichment_pool(self.enrichment_workers, broken=pool)
+                            if i in enrich_retried:
+                                finished.append((i, self._enrichment_error(post_data[i], e)))
+                            else:
+                                enrich_retried.add(i)
+                                enrich_started[i] = time.perf_counter()
+                                enrichment_pool, enrich_future = self._submit_enrichment(enrichment_pool, row)
+                                enrich_jobs[i] = (enrichment_pool, row)
+                                pending[enrich_future] = ("enrich", [i])
+                        except Exception as e:
+                            finished.append((i, self._enrichment_error(post_data[i], e)))
+
+                for i, (analysis, error) in analyzed:
+                    if i not in analyses:
+                        self.duplicates_skipped += 1
+                        metrics.increment("pipeline.duplicates_skipped")
+                    if error is not None:
+                        self.errors.append(error)
+                        finished.append((i, build_error_result(post_data[i])))
+                    elif self.enricher is None:
+                        finished.append((i, build_result(post_data[i], analysis)))
+                    elif enrichment_pool is None:
+                        try:
+                            with metrics.timer("pipeline.enrich"):
+                                finished.append((i, self.enricher.enrich_post(build_result(post_data[i], analysis))))
+                        except Exception as e:
+                            finished.append((i, self._enrichment_error(post_data[i], e)))
+                    else:
+                        row = build_result(post_data[i], analysis)
+                        enrich_started[i] = time.perf_counter()
+                        enrichment_pool, enrich_future = self._submit_enrichment(enrichment_pool, row)
+                        enrich_jobs[i] = (enrichment_pool, row)
+                        pending[enrich_future] = ("enrich", [i])
+
+                for i, row in finished:
+                    if completed == 0:
+                        metrics.record("pipeline.first_result", time.perf_counter() - started)
+                    completed += 1
+                    if on_progress:
+                        on_progress(completed, total)
+                    yield i, row
+        finally:
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            analysis_pool.shutdown(wait=False, cancel_futures=True)
+            # The enrichment pool is shared with later runs, only drop this run's queued posts
+            for future in pending:
+                future.cancel()
+
+    def run(self, posts: List, on_progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """Process all posts and return one result row per post, in input order.
+
+        If the run is cancelled, posts that did not finish are left out.
+        """
+        results: List[Optional[Dict]] = [None] * len(posts)
+        for i, row in self.iter_results(posts, on_progress):
+            results[i] = row
+        return [row for row in results if row is not None]
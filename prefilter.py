@@ -0,0 +1,137 @@
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+from config import (TECH_STACK_KEYWORDS, MISSING_FEATURES, PREFILTER_THRESHOLD, DEFAULT_ANALYSIS)
+
+# Minimal UI tools get extra weight, as in the scoring guidance of ANALYSIS_PROMPT
+MINIMAL_UI_TOOLS = {'streamlit', 'gradio'}
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton matching many keywords in one pass over the text.
+
+    Matching is case-insensitive and only counts whole words (an optional
+    plural 's' is allowed), so 'api' matches 'APIs' but not 'rapid'.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for keyword in keywords:
+            self._insert(keyword.lower())
+        self._build_failure_links()
+
+    def _insert(self, keyword: str):
+        state = 0
+        for char in keyword:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append(keyword)
+
+    def _build_failure_links(self):
+        # Breadth-first, so every failure target is finished before it is used;
+        # depth-one states keep the root as their failure link
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                if state:
+                    self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    @staticmethod
+    def _is_boundary(text: str, start: int, end: int) -> bool:
+        if start > 0 and text[start - 1].isalnum():
+            return False
+        if end < len(text) and text[end] == 's':
+            end += 1
+        return end >= len(text) or not text[end].isalnum()
+
+    def find(self, text: str) -> Set[str]:
+        """Distinct keywords occurring in text as whole words."""
+        text = text.lower()
+        found = set()
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword in self._output[state]:
+                start = position - len(keyword) + 1
+                if self._is_boundary(text, start, position + 1):
+                    found.add(keyword)
+        return found
+
+
+class PreScorer:
+    """Cheap local lead score used to skip LLM calls on obviously cold posts.
+
+    Combines tech-stack and missing-feature keyword hits with
+    PostEnricher.analyze_traction signals into a 0-10 score. Only posts with
+    no keyword hit at all can be skipped: those scoring below threshold get
+    local_analysis() instead of an AI analysis.
+    """
+
+    def __init__(self, enricher=None, threshold: float = PREFILTER_THRESHOLD):
+        if enricher is None:
+            from enrichment import PostEnricher
+            enricher = PostEnricher()
+        self.enricher = enricher
+        self.threshold = threshold
+        self.tech_matcher = KeywordMatcher(TECH_STACK_KEYWORDS)
+        self.feature_matcher = KeywordMatcher(MISSING_FEATURES)
+        self.scored = 0
+        self.skipped = 0  # LLM calls avoided
+        self._lock = threading.Lock()
+
+    def score(self, text: str) -> float:
+        """Heuristic lead score between 0 and 10."""
+        return self._score(text, self.tech_matcher.find(text), self.feature_matcher.find(text))
+
+    def _score(self, text: str, tech: Set[str], features: Set[str]) -> float:
+        traction = self.enricher.analyze_traction(text)["engagement_score"]
+        score = (
+            1.5 * min(len(tech), 3)
+            + 1.5 * bool(tech & MINIMAL_UI_TOOLS)
+            + 1.0 * min(len(features), 3)
+            + 0.5 * traction
+        )
+        return min(score, 10.0)
+
+    def local_analysis(self, text: str, score: Optional[float] = None) -> dict:
+        """DEFAULT_ANALYSIS-shaped analysis derived locally for a skipped post."""
+        analysis = {key: (value.copy() if isinstance(value, list) else value)
+                    for key, value in DEFAULT_ANALYSIS.items()}
+        analysis["tech_stack"] = sorted(self.tech_matcher.find(text))
+        analysis["lead_score"] = round(self.score(text) if score is None else score, 1)
+        return analysis
+
+    def screen(self, text: str) -> Optional[dict]:
+        """None when the post should go to the AI analyzer, else its local analysis."""
+        tech = self.tech_matcher.find(text)
+        features = self.feature_matcher.find(text)
+        score = self._score(text, tech, features)
+        with self._lock:
+            self.scored += 1
+            # A single keyword is enough to be a lead, e.g. "Built a Flask dashboard"
+            if tech or features or score >= self.threshold:
+                return None
+            self.skipped += 1
+        return self.local_analysis(text, score)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "scored": self.scored,
+                "llm_calls_skipped": self.skipped,
+                "skip_rate": self.skipped / self.scored if self.scored else 0.0
+            }
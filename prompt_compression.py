@@ -0,0 +1,111 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from config import (TECH_STACK_KEYWORDS, MISSING_FEATURES, POST_TOKEN_BUDGET, HASHTAG_WALL_KEEP,
+                    TRACKING_PARAMS, TRACKING_PARAM_PREFIXES)
+from prefilter import KeywordMatcher
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"\')\]]+')
+HASHTAG_WALL_PATTERN = re.compile(r'(?:#\w+[ \t]*){4,}')
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+SENTENCE_PATTERN = re.compile(r'[^.!?\n]+[.!?]?')
+INLINE_SPACE_PATTERN = re.compile(r'[ \t\u00a0\u200b]+')
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+ELLIPSIS = " … "
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for Gemini prompts (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+@lru_cache(maxsize=1)
+def _keyword_matcher() -> KeywordMatcher:
+    return KeywordMatcher(TECH_STACK_KEYWORDS + MISSING_FEATURES)
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def strip_tracking(url: str) -> str:
+    """Remove utm_* and similar tracking parameters from a URL."""
+    trailing = ""
+    while url and url[-1] in ".,;:!?":
+        url, trailing = url[:-1], url[-1] + trailing
+    parts = urlsplit(url)
+    if not parts.query:
+        return url + trailing
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not _is_tracking_param(name)]
+    return urlunsplit(parts._replace(query=urlencode(query))) + trailing
+
+
+def _strip_emoji(text: str) -> str:
+    # Symbols (So), plus the joiners and variation selectors that glue emoji sequences together
+    return "".join(
+        char for char in text
+        if not (unicodedata.category(char) == "So" or char in "\u200d\ufe0e\ufe0f")
+    )
+
+
+def collapse_hashtags(text: str, keep: int = HASHTAG_WALL_KEEP) -> str:
+    """Shorten runs of hashtags to the first few plus any that name a tech keyword."""
+    matcher = _keyword_matcher()
+
+    def collapse(match: re.Match) -> str:
+        tags = HASHTAG_PATTERN.findall(match.group(0))
+        kept = [tag for n, tag in enumerate(tags) if n < keep or matcher.find(tag)]
+        return " ".join(f"#{tag}" for tag in kept) + " "
+
+    return HASHTAG_WALL_PATTERN.sub(collapse, text)
+
+
+def normalize(text: str) -> str:
+    """Strip tracking parameters and emoji, collapse hashtag walls and whitespace."""
+    text = URL_PATTERN.sub(lambda match: strip_tracking(match.group(0)), text)
+    text = _strip_emoji(text)
+    text = collapse_hashtags(text)
+    lines = [INLINE_SPACE_PATTERN.sub(" ", line).strip() for line in text.splitlines()]
+    return BLANK_LINES_PATTERN.sub("\n\n", "\n".join(lines)).strip()
+
+
+def truncate(text: str, max_tokens: int = POST_TOKEN_BUDGET) -> str:
+    """Fit text into max_tokens, keeping the head, the tail and keyword sentences.
+
+    About 60% of the budget goes to the start of the post and 25% to the end.
+    What remains is filled with sentences from the middle that mention a tech
+    stack or missing-feature keyword. Keywords that still do not fit are
+    listed on a final line, so none of them is lost to truncation.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens * 4  # Characters
+    head_end = text.rfind(" ", 0, int(budget * 0.6))
+    head_end = head_end if head_end > 0 else int(budget * 0.6)
+    tail_start = text.find(" ", len(text) - int(budget * 0.25))
+    tail_start = tail_start if tail_start >= 0 else len(text) - int(budget * 0.25)
+    head, middle, tail = text[:head_end], text[head_end:tail_start], text[tail_start:]
+
+    matcher = _keyword_matcher()
+    remaining = budget - len(head) - len(tail) - 2 * len(ELLIPSIS)
+    kept: List[str] = []
+    for sentence in SENTENCE_PATTERN.findall(middle):
+        sentence = sentence.strip()
+        if sentence and matcher.find(sentence) and len(sentence) <= remaining:
+            kept.append(sentence)
+            remaining -= len(sentence) + 1
+
+    compressed = head + ELLIPSIS + (" ".join(kept) + ELLIPSIS if kept else "") + tail.strip()
+    lost = sorted(matcher.find(text) - matcher.find(compressed))
+    if lost:
+        compressed += "\nAlso mentions: " + ", ".join(lost)
+    return compressed
+
+
+def compress_post(text: str, max_tokens: int = POST_TOKEN_BUDGET) -> str:
+    """Prepare a post for the analysis prompt: normalize, then fit it to the token budget."""
+    return truncate(normalize(text), max_tokens)
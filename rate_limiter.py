@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from config import RATE_LIMIT_RPM, RATE_LIMIT_TPM, RATE_LIMIT_STATE_FILE
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a process-local limiter
+    fcntl = None
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """True for Gemini 429 / RESOURCE_EXHAUSTED quota errors."""
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "resource exhausted" in message or "resource_exhausted" in message
+
+
+class TokenBucket:
+    """Token bucket holding up to capacity tokens, refilled at rate tokens per second.
+
+    Each reservation is charged in full, even above capacity; the balance then
+    goes into debt that later callers wait out.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.time()
+
+    def reserve(self, amount: float, rate: float, now: float) -> float:
+        """Take amount tokens at the given refill rate and return seconds to wait.
+
+        The balance may go negative; later callers then queue up behind the debt.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= amount
+        return -self.tokens / rate if self.tokens < 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {"tokens": self.tokens, "updated": self.updated}
+
+    def load(self, state: Dict):
+        self.tokens = state.get("tokens", self.capacity)
+        self.updated = state.get("updated", time.time())
+
+
+class AdaptiveRateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter with AIMD rate adaptation.
+
+    Both quotas are token buckets. A throttling error halves the effective rate
+    and pauses all callers for a cooldown; every success raises the rate again
+    by increase_step until it is back at the configured quota. When state_file is
+    set, bucket state is shared between processes through an flock-protected file.
+    """
+
+    def __init__(self, requests_per_minute: float = RATE_LIMIT_RPM,
+                 tokens_per_minute: float = RATE_LIMIT_TPM,
+                 state_file: Optional[str] = RATE_LIMIT_STATE_FILE,
+                 min_scale: float = 0.05, increase_step: float = 0.05,
+                 cooldown: float = 2.0):
+        self.requests = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60))
+        # A full minute of token quota, so a large batched prompt is charged its real size
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self.scale = 1.0
+        self.min_scale = min_scale
+        self.increase_step = increase_step
+        self.cooldown = cooldown
+        self.blocked_until = 0.0
+        self.throttle_count = 0
+        self.state_file = state_file if fcntl is not None else None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _state(self):
+        """Hold the limiter lock, loading and saving shared state when file backed."""
+        with self._lock:
+            if self.state_file is None:
+                yield
+                return
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.state_file, "a+") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    handle.seek(0)
+                    content = handle.read()
+                    if content:
+                        state = json.loads(content)
+                        self.requests.load(state["requests"])
+                        self.tokens.load(state["tokens"])
+                        self.scale = state["scale"]
+                        self.blocked_until = state["blocked_until"]
+                    yield
+                    handle.seek(0)
+                    handle.truncate()
+                    json.dump({
+                        "requests": self.requests.to_dict(),
+                        "tokens": self.tokens.to_dict(),
+                        "scale": self.scale,
+                        "blocked_until": self.blocked_until
+                    }, handle)
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Reserve one request carrying the estimated tokens, return seconds to wait."""
+        with self._state():
+            now = time.time()
+            wait = max(
+                self.blocked_until - now,
+                self.requests.reserve(1, self.requests.rate * self.scale, now),
+                self.tokens.reserve(tokens, self.tokens.rate * self.scale, now)
+            )
+        return max(0.0, wait)
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until a request with the estimated tokens may be sent."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        """Additively raise the rate back towards the configured quota."""
+        with self._state():
+            self.scale = min(1.0, self.scale + self.increase_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Halve the rate and pause every caller after a 429 / resource-exhausted error."""
+        with self._state():
+            self.throttle_count += 1
+            self.scale = max(self.min_scale, self.scale / 2)
+            pause = retry_after if retry_after is not None else self.cooldown
+            self.blocked_until = max(self.blocked_until, time.time() + pause)
+
+
+_shared_limiter: Optional[AdaptiveRateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_limiter() -> AdaptiveRateLimiter:
+    """Process-wide limiter so every AIAnalyzer (and Streamlit session) shares the quota."""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter()
+        return _shared_limiter
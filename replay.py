@@ -0,0 +1,362 @@
+"""Record live scraper and Gemini traffic, then replay it offline.
+
+Recording wraps the real LinkedInScraper and the analyzer's Gemini model and
+appends every response body, with the time it took, to a JSONL fixture file
+(gzip-compressed when the path ends in .gz):
+
+    python -m replay record "streamlit app" --tags "#buildinpublic" --output fixtures.jsonl.gz
+
+ReplayScraper and ReplayModel serve those responses back with the recorded
+(or a fixed) latency, and can inject 429s and malformed JSON. They need no
+network or API keys, so the whole processing path can be benchmarked
+without using quota:
+
+    fixtures = Fixtures.load("fixtures.jsonl.gz")
+    scraper = ReplayScraper(fixtures)
+    analyzer = AIAnalyzer(model=ReplayModel(fixtures, malformed_rate=0.05))
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from config import DEFAULT_ANALYSIS, SEARCH_API_URL
+from http_cache import cache_key
+from linkedin_scraper import LinkedInScraper
+from structured_output import decode_response
+
+BATCH_HEADER_PATTERN = re.compile(r"^\[Post \d+\]$", re.MULTILINE)
+
+DEFAULT_GEMINI_LATENCY = 1.0  # Seconds, when the fixtures hold no Gemini responses
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def prompt_key(prompt: str) -> str:
+    """Fixture key for a Gemini prompt."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class Fixtures:
+    """Recorded HTTP response bodies and Gemini responses, each with its latency.
+
+    HTTP entries are keyed by http_cache.cache_key (so API keys are never
+    stored), Gemini entries by prompt_key. Later entries replace earlier ones
+    with the same key.
+    """
+
+    def __init__(self):
+        self.http: Dict[str, Tuple[str, float]] = {}
+        self.gemini: Dict[str, Tuple[str, float]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "Fixtures":
+        fixtures = cls()
+        with _open(path, "r") as handle:
+            for line in handle:
+                if line.strip():
+                    fixtures.add(json.loads(line))
+        return fixtures
+
+    def add(self, entry: Dict):
+        """Add one {"kind": "http"|"gemini", "key", "body", "latency"} entry."""
+        store = self.http if entry["kind"] == "http" else self.gemini
+        store[entry["key"]] = (entry["body"], float(entry.get("latency", 0.0)))
+
+    def save(self, path: str):
+        with _open(path, "w") as handle:
+            for kind, store in (("http", self.http), ("gemini", self.gemini)):
+                for key, (body, latency) in store.items():
+                    handle.write(json.dumps({"kind": kind, "key": key, "body": body, "latency": latency}) + "\n")
+
+    def page_keys(self) -> List[str]:
+        """Keys of the recorded post pages, i.e. every HTTP entry but search API calls."""
+        return sorted(key for key in self.http if not key.startswith(SEARCH_API_URL))
+
+    def analyses(self) -> List[Dict]:
+        """Every per-post analysis in the recorded Gemini responses, single or batched."""
+        analyses = []
+        for text, _ in self.gemini.values():
+            try:
+                value = decode_response(text)
+            except ValueError:
+                continue
+            entries = value if isinstance(value, list) else [value]
+            analyses.extend({k: v for k, v in entry.items() if k != "index"}
+                            for entry in entries if isinstance(entry, dict))
+        return analyses
+
+
+class Recorder:
+    """Thread-safe appender of fixture entries."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._handle = _open(path, "a")
+
+    def record(self, kind: str, key: str, body: str, latency: float):
+        line = json.dumps({"kind": kind, "key": key, "body": body, "latency": round(latency, 4)})
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def close(self):
+        with self._lock:
+            self._handle.close()
+
+
+class RecordingScraper(LinkedInScraper):
+    """LinkedInScraper that records every response body it fetches.
+
+    The HTTP cache is bypassed so recorded latencies are real network times.
+    """
+
+    def __init__(self, recorder: Recorder, **kwargs):
+        super().__init__(**kwargs)
+        self.http_cache = None
+        self.recorder = recorder
+
+    def _fetch_text(self, url: str, params: Optional[dict] = None) -> str:
+        start = time.perf_counter()
+        text = super()._fetch_text(url, params)
+        self.recorder.record("http", cache_key(url, params), text, time.perf_counter() - start)
+        return text
+
+
+class RecordingModel:
+    """Wraps a Gemini model, recording the text and latency of every response."""
+
+    def __init__(self, model, recorder: Recorder):
+        self.model = model
+        self.recorder = recorder
+
+    def generate_content(self, prompt: str, generation_config=None):
+        start = time.perf_counter()
+        response = self.model.generate_content(prompt, generation_config=generation_config)
+        self._record(prompt, response, time.perf_counter() - start)
+        return response
+
+    async def generate_content_async(self, prompt: str, generation_config=None):
+        start = time.perf_counter()
+        response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+        self._record(prompt, response, time.perf_counter() - start)
+        return response
+
+    def _record(self, prompt: str, response, latency: float):
+        if response and response.text:
+            self.recorder.record("gemini", prompt_key(prompt), response.text, latency)
+
+
+class _Replayer:
+    """Latency and fault injection shared by the replay stand-ins.
+
+    latency=None replays each response's recorded latency, a number replaces
+    it; either way it is multiplied by latency_scale. throttle_rate is the
+    chance a request fails with a 429. Faults are drawn from a seeded RNG, so
+    a run is reproducible for a given request order.
+    """
+
+    def __init__(self, latency: Optional[float] = None, latency_scale: float = 1.0,
+                 throttle_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.throttle_rate = throttle_rate
+        self.requests = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self, recorded: float) -> float:
+        return (recorded if self.latency is None else self.latency) * self.latency_scale
+
+    def roll(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self._random.random() < rate
+
+    def start_request(self) -> bool:
+        """Count a request, returns True when it should be throttled."""
+        throttled = self.roll(self.throttle_rate)
+        with self.lock:
+            self.requests += 1
+            self.throttled += throttled
+        return throttled
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"requests": self.requests, "throttled": self.throttled}
+
+
+class ReplayScraper(LinkedInScraper):
+    """LinkedInScraper serving recorded response bodies instead of the network.
+
+    Everything above the network (per-host throttling, page extraction,
+    search result handling) runs as it does live. Post pages that were not
+    recorded are served one of the recorded pages, chosen by URL, so any
+    number of search hits can be replayed; unrecorded search API calls
+    return no results. Injected 429s surface as requests.HTTPError, like a
+    live rate-limited response after retries.
+    """
+
+    def __init__(self, fixtures: Fixtures, latency: Optional[float] = None, latency_scale: float = 1.0,
+                 throttle_rate: float = 0.0, seed: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.http_cache = None
+        self.fixtures = fixtures
+        self.replayer = _Replayer(latency, latency_scale, throttle_rate, seed)
+        self._pages = fixtures.page_keys()
+
+    def _search_api_key(self) -> str:
+        return "replay"  # Left out of fixture keys, any value matches
+
+    def _fetch_text(self, url: str, params: Optional[dict] = None) -> str:
+        key = cache_key(url, params)
+        entry = self.fixtures.http.get(key)
+        if entry is None:
+            if url.startswith(SEARCH_API_URL) or not self._pages:
+                entry = (json.dumps({"organic_results": []}), 0.0)
+            else:
+                page = int(hashlib.md5(key.encode("utf-8")).hexdigest(), 16) % len(self._pages)
+                entry = self.fixtures.http[self._pages[page]]
+        body, recorded = entry
+
+        with self.throttle.slot(urlparse(url).netloc):
+            throttled = self.replayer.start_request()
+            time.sleep(self.replayer.delay(recorded))
+        if throttled:
+            response = requests.Response()
+            response.status_code, response.url = 429, url
+            raise requests.HTTPError("429 Client Error: Too Many Requests (replayed)", response=response)
+        return body
+
+    def recorded_posts(self, count: Optional[int] = None) -> List[dict]:
+        """Search hits for the recorded post pages, repeated with distinct URLs up to count."""
+        count = len(self._pages) if count is None else count
+        posts = []
+        for i in range(count):
+            url = self._pages[i % len(self._pages)] if self._pages else "https://www.linkedin.com/posts/replay"
+            if i >= len(self._pages):
+                url = f"{url}{'&' if '?' in url else '?'}replay={i}"
+            posts.append({"url": url, "snippet": "", "date": ""})
+        return posts
+
+
+class ReplayThrottled(Exception):
+    """Injected Gemini quota error, recognized by rate_limiter.is_throttle_error."""
+
+    def __init__(self):
+        super().__init__("429 Resource exhausted (replayed)")
+
+
+class ReplayResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ReplayModel:
+    """Stand-in for a Gemini GenerativeModel serving recorded responses.
+
+    Prompts that were recorded get their recorded response. Others (e.g. a
+    different batch size, or more posts than were recorded) get a response of
+    the right shape built from recorded analyses: an object for single-post
+    prompts, an indexed array for batch prompts. malformed_rate is the chance
+    a response is cut off mid-JSON.
+    """
+
+    def __init__(self, fixtures: Fixtures, latency: Optional[float] = None, latency_scale: float = 1.0,
+                 throttle_rate: float = 0.0, malformed_rate: float = 0.0, seed: int = 0):
+        self.fixtures = fixtures
+        self.malformed_rate = malformed_rate
+        self.malformed = 0
+        self.replayer = _Replayer(latency, latency_scale, throttle_rate, seed)
+        self._analyses = fixtures.analyses() or [DEFAULT_ANALYSIS]
+        latencies = [latency for _, latency in fixtures.gemini.values()]
+        self._mean_latency = sum(latencies) / len(latencies) if latencies else DEFAULT_GEMINI_LATENCY
+
+    def _respond(self, prompt: str) -> Tuple[str, float]:
+        """Response text and recorded latency for a prompt, synthesized when not recorded"""
+        key = prompt_key(prompt)
+        entry = self.fixtures.gemini.get(key)
+        if entry is None:
+            first = int(key, 16) % len(self._analyses)
+            posts = len(BATCH_HEADER_PATTERN.findall(prompt))
+            if posts:
+                value = [{"index": n, **self._analyses[(first + n) % len(self._analyses)]} for n in range(posts)]
+            else:
+                value = self._analyses[first]
+            entry = (json.dumps(value), self._mean_latency)
+        text, recorded = entry
+        if self.replayer.roll(self.malformed_rate):
+            with self.replayer.lock:
+                self.malformed += 1
+            text = text[:len(text) // 2]
+        return text, recorded
+
+    def generate_content(self, prompt: str, generation_config=None) -> ReplayResponse:
+        throttled = self.replayer.start_request()
+        text, recorded = self._respond(prompt)
+        time.sleep(self.replayer.delay(recorded))
+        if throttled:
+            raise ReplayThrottled()
+        return ReplayResponse(text)
+
+    async def generate_content_async(self, prompt: str, generation_config=None) -> ReplayResponse:
+        throttled = self.replayer.start_request()
+        text, recorded = self._respond(prompt)
+        await asyncio.sleep(self.replayer.delay(recorded))
+        if throttled:
+            raise ReplayThrottled()
+        return ReplayResponse(text)
+
+    def stats(self) -> Dict:
+        return {**self.replayer.stats(), "malformed": self.malformed}
+
+
+def record(keywords: str, tags: str, output: str) -> int:
+    """Run one live search through the pipeline, recording it to output. Returns the posts processed."""
+    import config
+    from ai_analyzer import AIAnalyzer, AsyncAIAnalyzer
+    from pipeline import PostPipeline
+
+    recorder = Recorder(output)
+    analyzer = AsyncAIAnalyzer() if config.ASYNC_ANALYZER else AIAnalyzer()
+    try:
+        analyzer.model = RecordingModel(analyzer.model, recorder)
+        analyzer.cache = None  # Every post must reach Gemini to be recorded
+        scraper = RecordingScraper(recorder)
+        posts = scraper.search_posts(keywords, tags)
+        # Enrichment is local, so there is nothing of it to record
+        return len(PostPipeline(scraper, analyzer).run(posts))
+    finally:
+        if isinstance(analyzer, AsyncAIAnalyzer):
+            analyzer.close()
+        recorder.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live scraper and Gemini traffic for offline replay.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Record one search and its analyses")
+    record_parser.add_argument("keywords")
+    record_parser.add_argument("--tags", default="")
+    record_parser.add_argument("--output", required=True, help="Fixture file, appended to (.jsonl or .jsonl.gz)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        count = record(args.keywords, args.tags, args.output)
+        print(f"Recorded {count} posts to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import datetime
+import io
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from config import RESULT_STORE_PATH, RESULT_STORE_BACKEND
+
+try:
+    import duckdb  # Optional, faster sorted paging over large stores
+except ImportError:
+    duckdb = None
+
+# Every part file is written with this schema, so runs with and without
+# enrichment can be queried together; missing columns are stored as nulls
+STORE_SCHEMA = pa.schema([
+    ("Post Text", pa.string()),
+    ("Post URL", pa.string()),
+    ("Post Date", pa.string()),
+    ("Author", pa.string()),
+    ("Reactions", pa.int64()),
+    ("Tech Stack", pa.string()),
+    ("Project Stage", pa.string()),
+    ("Missing Features", pa.string()),
+    ("Potential Needs", pa.string()),
+    ("Suggested Services", pa.string()),
+    ("Lead Score", pa.float64()),
+    ("Website", pa.string()),
+    ("Email", pa.string()),
+    ("Sentiment Score", pa.float64()),
+    ("Sentiment", pa.string()),
+    ("Engagement Score", pa.int64()),
+    ("Engagement Indicators", pa.string()),
+    ("Keywords", pa.string()),
+    ("Tags", pa.string()),
+    ("Run ID", pa.string()),
+    ("Stored At", pa.timestamp("s")),
+])
+
+# Hive-style partition directory, e.g. run_date=2024-05-01/
+PARTITION_SCHEMA = pa.schema([("run_date", pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+Filters = Tuple  # (min_score, stages, sentiments, start_date, end_date), see ResultStore.filter_key
+
+
+class ResultStore:
+    """Local columnar store of analyzed posts, appended to across runs.
+
+    Results are stored as a Parquet dataset partitioned by the date they were
+    stored (run_date=YYYY-MM-DD), one part file per append. Queries push the
+    Lead Score, Project Stage, Sentiment and date predicates down to the
+    scan, so only matching row groups and partitions are read. DuckDB is used
+    for querying when installed, otherwise pyarrow.dataset; both return the
+    same rows, ordered by Lead Score (highest first).
+    """
+
+    def __init__(self, path: str = RESULT_STORE_PATH, backend: str = RESULT_STORE_BACKEND):
+        if backend == "auto":
+            backend = "duckdb" if duckdb is not None else "pyarrow"
+        if backend == "duckdb" and duckdb is None:
+            raise ValueError("The duckdb result store backend needs the duckdb package")
+        if backend not in ("duckdb", "pyarrow"):
+            raise ValueError(f"Unknown result store backend: {backend}")
+        self.path = path
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._dataset = None
+        self._sorted: Optional[Tuple[Filters, pa.Table]] = None  # Last sorted pyarrow query result
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def filter_key(min_score: Optional[float] = None,
+                   stages: Optional[Sequence[str]] = None,
+                   sentiments: Optional[Sequence[str]] = None,
+                   start_date: Optional[datetime.date] = None,
+                   end_date: Optional[datetime.date] = None) -> Filters:
+        """Hashable key for a set of filters; None disables a filter."""
+        return (
+            None if min_score is None else float(min_score),
+            None if stages is None else tuple(sorted(stages)),
+            None if sentiments is None else tuple(sorted(sentiments)),
+            None if start_date is None else start_date.isoformat(),
+            None if end_date is None else end_date.isoformat(),
+        )
+
+    def append(self, results: pd.DataFrame, run_id: Optional[str] = None) -> int:
+        """Store a results DataFrame as a new part file, returns the rows written."""
+        if results is None or results.empty:
+            return 0
+        now = datetime.datetime.now().replace(microsecond=0)
+        df = results.reindex(columns=[field.name for field in STORE_SCHEMA])
+        df["Run ID"] = run_id or uuid.uuid4().hex
+        df["Stored At"] = now
+        table = pa.Table.from_pandas(df, schema=STORE_SCHEMA, preserve_index=False, safe=False)
+
+        partition = os.path.join(self.path, f"run_date={now.date().isoformat()}")
+        os.makedirs(partition, exist_ok=True)
+        name = f"part-{uuid.uuid4().hex}.parquet"
+        temp_path = os.path.join(partition, "." + name)  # Hidden until complete, readers skip it
+        pq.write_table(table, temp_path)
+        with self._lock:
+            os.replace(temp_path, os.path.join(partition, name))
+            self._dataset = None
+            self._sorted = None
+        return len(df)
+
+    def _files(self) -> List[str]:
+        files = []
+        for root, _, names in os.walk(self.path):
+            files.extend(os.path.join(root, name) for name in names
+                         if name.endswith(".parquet") and not name.startswith("."))
+        return sorted(files)
+
+    def _get_dataset(self) -> Optional[ds.Dataset]:
+        with self._lock:
+            if self._dataset is None:
+                files = self._files()
+                if not files:
+                    return None
+                schema = pa.unify_schemas([STORE_SCHEMA, PARTITION_SCHEMA])
+                self._dataset = ds.dataset(files, schema=schema, format="parquet",
+                                           partitioning=PARTITIONING, partition_base_dir=self.path)
+            return self._dataset
+
+    # pyarrow backend
+
+    @staticmethod
+    def _expression(filters: Filters) -> Optional[ds.Expression]:
+        min_score, stages, sentiments, start_date, end_date = filters
+        conditions = []
+        if min_score is not None:
+            conditions.append(pc.field("Lead Score") >= min_score)
+        if stages is not None:
+            conditions.append(pc.field("Project Stage").isin(pa.array(stages, pa.string())))
+        if sentiments is not None:
+            conditions.append(pc.field("Sentiment").isin(pa.array(sentiments, pa.string())))
+        if start_date is not None:
+            conditions.append(pc.field("run_date") >= start_date)
+        if end_date is not None:
+            conditions.append(pc.field("run_date") <= end_date)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def _sorted_table(self, dataset: ds.Dataset, filters: Filters) -> pa.Table:
+        # Pages of the same query are slices of one sorted table
+        with self._lock:
+            if self._sorted is not None and self._sorted[0] == filters:
+                return self._sorted[1]
+        table = dataset.to_table(columns=STORE_SCHEMA.names, filter=self._expression(filters))
+        table = table.sort_by([("Lead Score", "descending"), ("Stored At", "descending")])
+        with self._lock:
+            self._sorted = (filters, table)
+        return table
+
+    # DuckDB backend
+
+    def _sql(self, filters: Filters) -> Tuple[str, List]:
+        min_score, stages, sentiments, start_date, end_date = filters
+        conditions, params = [], []
+        if min_score is not None:
+            conditions.append('"Lead Score" >= ?')
+            params.append(min_score)
+        for column, values in (("Project Stage", stages), ("Sentiment", sentiments)):
+            if values is not None:
+                if not values:
+                    conditions.append("FALSE")
+                else:
+                    conditions.append(f'"{column}" IN ({", ".join("?" * len(values))})')
+                    params.extend(values)
+        if start_date is not None:
+            conditions.append("run_date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            conditions.append("run_date <= ?")
+            params.append(end_date)
+        source = (f"read_parquet('{os.path.join(self.path, '*', '*.parquet')}', "
+                  "hive_partitioning = true, union_by_name = true)")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"FROM {source}{where}", params
+
+    def _columns_sql(self) -> str:
+        return ", ".join(f'"{name}"' for name in STORE_SCHEMA.names)
+
+    # Queries
+
+    def count(self, filters: Filters = (None,) * 5) -> int:
+        """Number of stored rows matching filters."""
+        dataset = self._get_dataset()
+        if dataset is None:
+            return 0
+        if self.backend == "duckdb":
+            source, params = self._sql(filters)
+            return duckdb.connect().execute(f"SELECT COUNT(*) {source}", params).fetchone()[0]
+        return dataset.count_rows(filter=self._expression(filters))
+
+    def query(self, filters: Filters = (None,) * 5, offset: int = 0,
+              limit: Optional[int] = None) -> pd.DataFrame:
+        """One page of matching rows, highest Lead Score first."""
+        dataset = self._get_dataset()
+        if dataset is None:
+            return STORE_SCHEMA.empty_table().to_pandas()
+        if self.backend == "duckdb":
+            source, params = self._sql(filters)
+            page = f" LIMIT {int(limit)}" if limit is not None else ""
+            return duckdb.connect().execute(
+                f'SELECT {self._columns_sql()} {source} '
+                f'ORDER BY "Lead Score" DESC, "Stored At" DESC{page} OFFSET {int(offset)}',
+                params
+            ).fetch_df()
+        table = self._sorted_table(dataset, filters)
+        length = table.num_rows - offset if limit is None else limit
+        return table.slice(offset, max(0, length)).to_pandas()
+
+    def export(self, filters: Filters = (None,) * 5, file_format: str = "csv") -> bytes:
+        """All matching rows as CSV or Parquet bytes, streamed batch by batch."""
+        buffer = io.BytesIO()
+        dataset = self._get_dataset()
+        if dataset is None:
+            batches, schema = [], STORE_SCHEMA
+        elif self.backend == "duckdb":
+            source, params = self._sql(filters)
+            reader = duckdb.connect().execute(
+                f'SELECT {self._columns_sql()} {source} ORDER BY "Lead Score" DESC, "Stored At" DESC', params
+            ).fetch_record_batch()
+            batches, schema = reader, reader.schema
+        else:
+            table = self._sorted_table(dataset, filters)
+            batches, schema = table.to_batches(), table.schema
+        if file_format == "parquet":
+            with pq.ParquetWriter(buffer, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+        elif file_format == "csv":
+            with pa_csv.CSVWriter(buffer, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+        else:
+            raise ValueError(f"Unknown export format: {file_format}")
+        return buffer.getvalue()
+
+    def stats(self) -> Dict:
+        files = self._files()
+        return {
+            "backend": self.backend,
+            "rows": self.count(),
+            "files": len(files),
+            "stored_bytes": sum(os.path.getsize(path) for path in files),
+        }
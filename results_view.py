@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class ResultsView:
+    """Analysis results prepared for fast repeated filtering across Streamlit reruns.
+
+    Project Stage and Sentiment are stored as categoricals with a precomputed
+    row index per category, and rows are pre-sorted by Lead Score, so a filter
+    is a searchsorted plus a few index unions rather than boolean masks over
+    every row. Filtered positions, CSV exports and insight metrics are memoized
+    on the filter tuple.
+    """
+
+    def __init__(self, results: pd.DataFrame, max_cached_filters: int = 32):
+        self.source = results
+        df = results.reset_index(drop=True)
+        df["Project Stage"] = df["Project Stage"].astype("category")
+        if "Sentiment" in df.columns:
+            df["Sentiment"] = df["Sentiment"].astype("category")
+        self.df = df
+
+        self._stage_index = self._category_index(df["Project Stage"])
+        self._sentiment_index = self._category_index(df["Sentiment"]) if "Sentiment" in df.columns else None
+
+        scores = df["Lead Score"].to_numpy(dtype=float)
+        self._score_order = np.argsort(scores, kind="stable")
+        self._sorted_scores = scores[self._score_order]
+
+        self.max_cached_filters = max_cached_filters
+        self._positions: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._csv: Dict[Tuple, bytes] = {}
+        self._metrics: Dict[Tuple, Dict] = {}
+
+    @staticmethod
+    def _category_index(column: pd.Series) -> Dict[str, np.ndarray]:
+        codes = column.cat.codes.to_numpy()
+        return {category: np.flatnonzero(codes == code) for code, category in enumerate(column.cat.categories)}
+
+    @staticmethod
+    def filter_key(min_score: float, stages: Iterable[str], sentiments: Optional[Iterable[str]] = None) -> Tuple:
+        """Hashable key for a filter combination."""
+        return (
+            float(min_score),
+            tuple(sorted(stages)),
+            tuple(sorted(sentiments)) if sentiments is not None else None
+        )
+
+    def _select(self, index: Dict[str, np.ndarray], values: Tuple[str, ...]) -> np.ndarray:
+        mask = np.zeros(len(self.df), dtype=bool)
+        for value in values:
+            if value in index:
+                mask[index[value]] = True
+        return mask
+
+    def positions(self, key: Tuple) -> np.ndarray:
+        """Row positions, in original order, matching a filter_key."""
+        if key in self._positions:
+            self._positions.move_to_end(key)
+            return self._positions[key]
+
+        min_score, stages, sentiments = key
+        mask = np.zeros(len(self.df), dtype=bool)
+        mask[self._score_order[np.searchsorted(self._sorted_scores, min_score, side="left"):]] = True
+        mask &= self._select(self._stage_index, stages)
+        if sentiments is not None and self._sentiment_index is not None:
+            mask &= self._select(self._sentiment_index, sentiments)
+        positions = np.flatnonzero(mask)
+
+        self._positions[key] = positions
+        if len(self._positions) > self.max_cached_filters:
+            evicted, _ = self._positions.popitem(last=False)
+            self._csv.pop(evicted, None)
+            self._metrics.pop(evicted, None)
+        return positions
+
+    def filter(self, key: Tuple) -> pd.DataFrame:
+        """Filtered results for a filter_key."""
+        return self.df.iloc[self.positions(key)]
+
+    def to_csv(self, key: Tuple) -> bytes:
+        """UTF-8 CSV export of the filtered results, memoized per filter."""
+        if key not in self._csv:
+            self._csv[key] = self.filter(key).to_csv(index=False).encode('utf-8')
+        return self._csv[key]
+
+    def metrics(self, key: Tuple) -> Dict:
+        """Insight metrics for the filtered results, memoized per filter.
+
+        Metrics whose source columns are missing are None.
+        """
+        if key in self._metrics:
+            return self._metrics[key]
+
+        filtered = self.filter(key)
+        metrics = {
+            "count": len(filtered),
+            "average_lead_score": filtered["Lead Score"].mean(),
+            "positive_sentiment_pct": None,
+            "contact_info_count": None,
+            "average_engagement": None
+        }
+        if "Sentiment" in filtered.columns:
+            metrics["positive_sentiment_pct"] = (filtered["Sentiment"] == "Positive").mean() * 100
+        if "Email" in filtered.columns or "Website" in filtered.columns:
+            contact_info_count = 0
+            if "Email" in filtered.columns: contact_info_count += filtered["Email"].notna().sum()
+            if "Website" in filtered.columns: contact_info_count += filtered["Website"].notna().sum()
+            metrics["contact_info_count"] = int(contact_info_count)
+        if "Engagement Score" in filtered.columns:
+            metrics["average_engagement"] = filtered["Engagement Score"].mean()
+
+        self._metrics[key] = metrics
+        return metrics
@@ -0,0 +1,172 @@
+import json
+import multiprocessing
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from config import (SENTIMENT_BACKEND, SENTIMENT_LEXICON_PATH, SENTIMENT_WORKERS, SENTIMENT_CHUNK_SIZE,
+                    POSITIVE_SENTIMENT_THRESHOLD, NEGATIVE_SENTIMENT_THRESHOLD)
+
+NEGATIONS = {"no", "not", "n't", "never"}
+TOKEN_PATTERN = re.compile(r"n't|[a-z0-9]+(?=n't)|[a-z0-9][a-z0-9'-]*|!")
+
+
+def classify_sentiment(score: float) -> str:
+    """Map a polarity score to Positive/Neutral/Negative."""
+    if score > POSITIVE_SENTIMENT_THRESHOLD:
+        return "Positive"
+    elif score < NEGATIVE_SENTIMENT_THRESHOLD:
+        return "Negative"
+    return "Neutral"
+
+
+class SentimentBackend(ABC):
+    """Scores text polarity in [-1, 1]."""
+
+    name = ""
+
+    @abstractmethod
+    def score(self, text: str) -> float:
+        """Polarity of one text."""
+
+    def score_many(self, texts: List[str]) -> List[float]:
+        return [self.score(text) for text in texts]
+
+    def analyze(self, text: str) -> Tuple[float, str]:
+        """Polarity score and sentiment label for one text."""
+        score = self.score(text)
+        return score, classify_sentiment(score)
+
+    def analyze_many(self, texts: List[str]) -> List[Tuple[float, str]]:
+        """Polarity scores and sentiment labels for many texts."""
+        return [(score, classify_sentiment(score)) for score in self.score_many(texts)]
+
+
+@lru_cache(maxsize=None)
+def _load_lexicon(path: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+    with open(path, encoding="utf-8") as handle:
+        lexicon = json.load(handle)
+    return lexicon["polarity"], lexicon["intensity"]
+
+
+class LexiconSentimentBackend(SentimentBackend):
+    """Dictionary-lookup scorer over a lexicon precomputed from TextBlob's.
+
+    Follows TextBlob's pattern analyzer in simplified form: the score is the
+    mean polarity of known words, a preceding modifier ("very") scales the next
+    word, a negation flips and halves it and "!" boosts it. The lexicon file is
+    loaded once per process.
+    """
+
+    name = "lexicon"
+
+    def __init__(self, path: str = SENTIMENT_LEXICON_PATH):
+        self.path = path
+        self.polarity, self.intensity = _load_lexicon(path)
+
+    def __reduce__(self):
+        # Ship only the path to worker processes; they load the lexicon themselves
+        return (LexiconSentimentBackend, (self.path,))
+
+    def score(self, text: str) -> float:
+        assessments = []
+        modifier = None  # Intensity of a preceding known modifier
+        negated = False
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            polarity = self.polarity.get(token)
+            if polarity is not None:
+                if modifier is not None:
+                    assessments[-1] = max(-1.0, min(polarity * modifier, 1.0))
+                else:
+                    assessments.append(polarity)
+                if negated:
+                    assessments[-1] *= -0.5
+                modifier = self.intensity.get(token)
+                negated = token in NEGATIONS
+            elif token in NEGATIONS:
+                negated = True
+            else:
+                # Retain negation and modifiers across short words ("not a good")
+                if negated and len(token) > 1:
+                    negated = False
+                if modifier is not None and len(token) > 2:
+                    modifier = None
+                if token == "!" and assessments:
+                    assessments[-1] = max(-1.0, min(assessments[-1] * 1.25, 1.0))
+        if not assessments:
+            return 0.0
+        return sum(assessments) / len(assessments)
+
+
+def _textblob_scores(texts: List[str]) -> List[float]:
+    from textblob import TextBlob
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+class TextBlobSentimentBackend(SentimentBackend):
+    """TextBlob polarity, scored over chunks in a process pool for large inputs."""
+
+    name = "textblob"
+
+    def __init__(self, workers: int = SENTIMENT_WORKERS, chunk_size: int = SENTIMENT_CHUNK_SIZE):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool = None  # Started on first large batch and reused, workers keep TextBlob imported
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def score(self, text: str) -> float:
+        return _textblob_scores([text])[0]
+
+    def score_many(self, texts: List[str]) -> List[float]:
+        if self.workers <= 1 or len(texts) <= self.chunk_size:
+            return _textblob_scores(texts)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        return [score for scores in self._pool.map(_textblob_scores, chunks) for score in scores]
+
+    def close(self):
+        """Shut down the scoring processes"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+BACKENDS = {
+    LexiconSentimentBackend.name: LexiconSentimentBackend,
+    TextBlobSentimentBackend.name: TextBlobSentimentBackend
+}
+
+
+@lru_cache(maxsize=None)
+def get_sentiment_backend(name: str = SENTIMENT_BACKEND) -> SentimentBackend:
+    """Shared backend instance for a name in BACKENDS."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def export_textblob_lexicon(path: str = SENTIMENT_LEXICON_PATH):
+    """Precompute the lexicon file for LexiconSentimentBackend from TextBlob's en-sentiment.xml."""
+    from textblob.en.sentiments import PatternAnalyzer
+    from textblob.en import sentiment as pattern_sentiment
+
+    PatternAnalyzer()  # Make sure the pattern lexicon is available
+    pattern_sentiment.load()
+    polarity, intensity = {}, {}
+    for word, senses in pattern_sentiment.items():
+        if " " in word or None not in senses:
+            continue
+        p, _, i = senses[None]
+        polarity[word] = round(p, 4)
+        if any(pos in pattern_sentiment.modifiers for pos in senses):
+            intensity[word] = round(i, 4)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"polarity": polarity, "intensity": intensity}, handle, sort_keys=True, separators=(",", ":"))
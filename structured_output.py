@@ -0,0 +1,117 @@
+import json
+import re
+from typing import Any, Dict, Optional
+from config import DEFAULT_ANALYSIS, PROJECT_STAGES
+
+try:
+    import orjson  # Optional, faster JSON decoding
+except ImportError:
+    orjson = None
+
+# ```json ... ``` (or bare ```) fences around a response
+FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE)
+
+STAGE_VALUES = PROJECT_STAGES + [DEFAULT_ANALYSIS["project_stage"]]
+
+
+def _schema_for(value: Any) -> Dict:
+    if isinstance(value, list):
+        return {"type": "array", "items": {"type": "string"}}
+    if isinstance(value, (int, float)):
+        return {"type": "number"}
+    return {"type": "string"}
+
+
+# Gemini response schemas, derived from the DEFAULT_ANALYSIS shape
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        key: (_schema_for(value) if key != "project_stage" else {"type": "string", "enum": STAGE_VALUES})
+        for key, value in DEFAULT_ANALYSIS.items()
+    },
+    "required": list(DEFAULT_ANALYSIS),
+}
+
+BATCH_ANALYSIS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"index": {"type": "integer"}, **ANALYSIS_SCHEMA["properties"]},
+        "required": ["index"] + ANALYSIS_SCHEMA["required"],
+    },
+}
+
+
+def loads(text: str) -> Any:
+    """Decode JSON with orjson when installed; raises ValueError on bad input."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def decode_response(text: str) -> Any:
+    """Decode a model response, tolerating code fences and surrounding prose.
+
+    Raises ValueError when no JSON value can be recovered.
+    """
+    try:
+        return loads(text)
+    except ValueError:
+        pass
+    fenced = FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1)
+        try:
+            return loads(text)
+        except ValueError:
+            pass
+    # Fall back to the outermost object or array in the text
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON value in response")
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]")
+    if end <= start:
+        raise ValueError("no JSON value in response")
+    return loads(text[start:end + 1])
+
+
+def _string_list(value: Any) -> Optional[list]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if item is not None and str(item).strip()]
+    return None
+
+
+def coerce_analysis(value: Any) -> Optional[Dict]:
+    """Validate a decoded analysis against the DEFAULT_ANALYSIS shape.
+
+    Missing keys get their default, list fields accept comma-separated
+    strings, lead_score is converted to a float clamped to 0-10 and unknown
+    project stages become "unknown". Extra keys are kept. Returns None when
+    the value is not an analysis object at all.
+    """
+    if not isinstance(value, dict):
+        return None
+    analysis = dict(value)
+    for key, default in DEFAULT_ANALYSIS.items():
+        if isinstance(default, list):
+            items = _string_list(analysis.get(key))
+            if items is None:
+                return None
+            analysis[key] = items
+
+    try:
+        lead_score = float(analysis.get("lead_score", DEFAULT_ANALYSIS["lead_score"]))
+    except (TypeError, ValueError):
+        return None
+    if lead_score != lead_score:  # NaN
+        return None
+    analysis["lead_score"] = min(max(lead_score, 0.0), 10.0)
+
+    stage = str(analysis.get("project_stage") or DEFAULT_ANALYSIS["project_stage"]).strip().lower()
+    analysis["project_stage"] = stage if stage in STAGE_VALUES else DEFAULT_ANALYSIS["project_stage"]
+    return analysis
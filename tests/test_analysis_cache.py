@@ -0,0 +1,92 @@
+"""AnalysisCache keys, expiry and LRU eviction, on a temporary SQLite file."""
+import pytest
+
+import analysis_cache
+from analysis_cache import AnalysisCache
+from config import DEFAULT_ANALYSIS
+
+ANALYSIS = {"tech_stack": ["streamlit"], "project_stage": "mvp", "missing_features": ["login"],
+            "potential_needs": [], "suggested_services": [], "lead_score": 7.0}
+
+
+class Clock:
+    """Stands in for the time module so expiry and access order need no sleeping."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(analysis_cache, "time", clock)
+    return clock
+
+
+def test_whitespace_only_edits_share_an_entry(tmp_path, clock):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("Built with  Streamlit.\n\nFeedback welcome", ANALYSIS)
+
+    assert cache.get("Built with Streamlit. Feedback welcome") == ANALYSIS
+    assert cache.get("Built with Gradio. Feedback welcome") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_prompt_version_and_model_are_part_of_the_key(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    AnalysisCache(path, prompt_version="v1", model="m1").set("post", ANALYSIS)
+
+    assert AnalysisCache(path, prompt_version="v1", model="m1").get("post") == ANALYSIS
+    assert AnalysisCache(path, prompt_version="v2", model="m1").get("post") is None
+    assert AnalysisCache(path, prompt_version="v1", model="m2").get("post") is None
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.set("post", ANALYSIS)
+
+    clock.now += 59
+    assert cache.get("post") == ANALYSIS
+    # Reading does not extend the lifetime, expiry counts from when it was stored
+    clock.now += 2
+    assert cache.get("post") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_expired_entries_are_purged_on_open(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    AnalysisCache(path, ttl=60).set("old post", ANALYSIS)
+    clock.now += 30
+    AnalysisCache(path, ttl=60).set("new post", ANALYSIS)
+
+    clock.now += 40
+    assert AnalysisCache(path, ttl=60).stats()["entries"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("first", ANALYSIS)
+    clock.now += 1
+    cache.set("second", ANALYSIS)
+    clock.now += 1
+    cache.get("first")  # Now more recently used than "second"
+    clock.now += 1
+    cache.set("third", ANALYSIS)
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("second") is None
+    assert cache.get("first") == ANALYSIS
+    assert cache.get("third") == ANALYSIS
+
+
+def test_default_analysis_is_only_cached_when_configured(tmp_path, clock):
+    cache = AnalysisCache(str(tmp_path / "skip.sqlite3"), cache_default_analysis=False)
+    cache.set("post", DEFAULT_ANALYSIS)
+    assert cache.get("post") is None
+
+    cache = AnalysisCache(str(tmp_path / "keep.sqlite3"), cache_default_analysis=True)
+    cache.set("post", DEFAULT_ANALYSIS)
+    assert cache.get("post") == DEFAULT_ANALYSIS
@@ -0,0 +1,134 @@
+"""Checkpointing and resume in the headless batch runner, with a stub scraper and analyzer."""
+import json
+
+import pytest
+
+import batch
+from batch import CHECKPOINT_FILE, JSONL_FILE, BatchRunner, Checkpoint, read_queries
+
+QUERIES = [("streamlit app", "#buildinpublic"), ("gradio demo", "")]
+
+
+class StubScraper:
+    """Five posts per search, each with its own text so none are deduplicated."""
+
+    def __init__(self):
+        self.fetched = []
+
+    def search_posts(self, keywords, tags=""):
+        return [{"url": f"https://www.linkedin.com/posts/{keywords.replace(' ', '-')}-{n}", "snippet": "", "date": ""}
+                for n in range(5)]
+
+    def extract_post_data(self, post):
+        self.fetched.append(post["url"])
+        return {"post_text": f"Built {post['url']} with streamlit, feedback welcome", "post_url": post["url"]}
+
+
+class StubAnalyzer:
+    def __init__(self):
+        self.analyzed = 0
+
+    def analyze_post(self, post_text):
+        return self.analyze_batch([post_text])[0]
+
+    def analyze_batch(self, posts):
+        self.analyzed += len(posts)
+        return [{"tech_stack": ["streamlit"], "project_stage": "mvp", "lead_score": 6.0} for _ in posts]
+
+    def enrich_analysis(self, analysis):
+        return analysis
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def make_runner(monkeypatch):
+    monkeypatch.setattr(batch, "LinkedInScraper", StubScraper)
+    monkeypatch.setattr(batch, "AIAnalyzer", StubAnalyzer)
+    monkeypatch.setattr(batch, "AsyncAIAnalyzer", StubAnalyzer)
+
+    def make(output_dir, **kwargs) -> BatchRunner:
+        return BatchRunner(str(output_dir), enrich=False, **kwargs)
+
+    return make
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_read_queries_skips_comments_and_splits_tags(tmp_path):
+    path = tmp_path / "queries.txt"
+    path.write_text("# nightly searches\nstreamlit app | #buildinpublic #saas\n\n  gradio demo  \n", encoding="utf-8")
+
+    assert read_queries(str(path)) == [("streamlit app", "#buildinpublic #saas"), ("gradio demo", "")]
+
+
+def test_checkpoint_ignores_a_torn_last_line(tmp_path):
+    path = tmp_path / CHECKPOINT_FILE
+    path.write_text('{"query": "q", "url": "a"}\n{"query": "q", "done": true}\n{"query": "q", "ur', encoding="utf-8")
+
+    checkpoint = Checkpoint(str(path))
+    checkpoint.post_done("q", "b")
+    checkpoint.close()
+
+    assert checkpoint.finished_posts == {("q", "a"), ("q", "b")}
+    assert checkpoint.finished_queries == {"q"}
+    assert len(read_jsonl(path)) == 3
+
+
+def test_rerun_after_an_interruption_resumes_without_duplicates(tmp_path, make_runner):
+    # First run is killed after three posts of the first search
+    runner = make_runner(tmp_path)
+    rows = runner.iter_query(*QUERIES[0])
+    for _ in range(3):
+        next(rows)
+    rows.close()
+    runner.writer.close()
+    runner.checkpoint.close()
+
+    runner = make_runner(tmp_path)
+    runner.run(QUERIES, verbose=False)
+
+    urls = [row["Post URL"] for row in read_jsonl(tmp_path / JSONL_FILE)]
+    assert len(urls) == len(set(urls)) == 10
+    # Only the posts that had not finished were fetched and analyzed again
+    assert len(runner.scraper.fetched) == 7
+    assert runner.analyzer.analyzed == 7
+    assert runner.rows_written == 7
+
+
+def test_finished_searches_are_skipped_entirely(tmp_path, make_runner):
+    make_runner(tmp_path).run(QUERIES, verbose=False)
+
+    runner = make_runner(tmp_path)
+    runner.run(QUERIES, verbose=False)
+
+    assert runner.scraper.fetched == []
+    assert len(read_jsonl(tmp_path / JSONL_FILE)) == 10
+
+
+def test_parquet_rows_are_on_disk_before_their_posts_are_checkpointed(tmp_path, make_runner):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    runner = make_runner(tmp_path, output_format="parquet", flush_every=4)
+    rows = runner.iter_query(*QUERIES[0])
+    for _ in range(5):
+        next(rows)
+
+    # Four rows filled a part file and were checkpointed, the fifth is still buffered
+    assert len(runner.checkpoint.finished_posts) == 4
+    assert len(pd.read_parquet(tmp_path)) == 4
+    rows.close()
+    runner.checkpoint.close()
+
+    runner = make_runner(tmp_path, output_format="parquet", flush_every=4)
+    runner.run(QUERIES, verbose=False)
+
+    results = pd.read_parquet(tmp_path)
+    assert len(results) == results["Post URL"].nunique() == 10
@@ -0,0 +1,66 @@
+"""Exact and MinHash near-duplicate detection in dedup.Deduplicator."""
+import pytest
+
+from dedup import Deduplicator, group_duplicates, normalize_text, shingles
+
+LAUNCH = ("Just launched our analytics dashboard built with Streamlit after three months of evenings and weekends. "
+          "It tracks sales by region, flags churn risk and emails a weekly summary to the team. "
+          "Next up are user roles, single sign on and a proper billing page. Feedback very welcome!")
+# One word changed: 0.875 Jaccard similarity of word 3-shingles with LAUNCH
+REPOST = LAUNCH.replace("three months", "four months")
+# Same opening sentences, different second half: 0.48 Jaccard similarity
+SAME_OPENING = (LAUNCH.split(". Next up")[0]
+                + ". Totally different ending about hiring a designer for our mobile app in Lisbon next month.")
+UNRELATED = ("Just launched our analytics dashboard built with Gradio. It predicts demand for a bakery chain, "
+             "and we are hiring a data engineer in Berlin. Apply through the link below.")
+
+
+def test_normalize_text_ignores_case_punctuation_and_spacing():
+    assert normalize_text("Built   with STREAMLIT!!\nFeedback, please.") == "built with streamlit feedback please"
+
+
+def test_short_texts_are_a_single_shingle():
+    assert shingles("built with streamlit", size=3) == ["built with streamlit"]
+    assert shingles("built a tool with streamlit", size=3) == [
+        "built a tool", "a tool with", "tool with streamlit"]
+
+
+def test_exact_duplicates_match_after_normalization():
+    deduplicator = Deduplicator()
+    assert deduplicator.add("original", LAUNCH) is None
+    assert deduplicator.add("shouted", LAUNCH.upper().replace("!", "!!!")) == "original"
+    assert (deduplicator.exact_duplicates, deduplicator.near_duplicates) == (1, 0)
+
+
+def test_one_word_edit_is_a_near_duplicate_at_the_default_threshold():
+    deduplicator = Deduplicator()
+    deduplicator.add("original", LAUNCH)
+
+    assert deduplicator.add("repost", REPOST) == "original"
+    assert deduplicator.near_duplicates == 1
+
+
+def test_posts_sharing_only_an_opening_or_a_template_are_kept_apart():
+    deduplicator = Deduplicator()
+    deduplicator.add("original", LAUNCH)
+
+    assert deduplicator.add("same opening", SAME_OPENING) is None
+    assert deduplicator.add("unrelated", UNRELATED) is None
+
+
+def test_a_stricter_threshold_keeps_the_repost_separate():
+    # The estimated similarity of REPOST is about 0.84, below 0.95
+    deduplicator = Deduplicator(threshold=0.95)
+    deduplicator.add("original", LAUNCH)
+
+    assert deduplicator.add("repost", REPOST) is None
+
+
+def test_group_duplicates_points_every_copy_at_its_first_occurrence():
+    texts = [LAUNCH, UNRELATED, REPOST, LAUNCH.lower(), SAME_OPENING]
+    assert group_duplicates(texts) == [0, 1, 0, 0, 4]
+
+
+def test_permutations_must_split_evenly_into_bands():
+    with pytest.raises(ValueError):
+        Deduplicator(num_perm=64, bands=10)
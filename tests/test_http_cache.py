@@ -0,0 +1,136 @@
+"""HTTPCache storage and eviction, and the scraper's conditional GET path against
+a local server that honours If-None-Match."""
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import http_cache
+from http_cache import HTTPCache, cache_key
+from linkedin_scraper import HostThrottle, LinkedInScraper
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_cache, "time", clock)
+    return clock
+
+
+def test_cache_key_sorts_params_and_drops_the_api_key():
+    url = "https://serpapi.com/search.json"
+    first = cache_key(url, {"q": "streamlit", "start": 10, "api_key": "secret"})
+    second = cache_key(url, {"start": 10, "api_key": "other", "q": "streamlit"})
+
+    assert first == second == "https://serpapi.com/search.json?q=streamlit&start=10"
+    assert cache_key(url) == url
+
+
+def test_store_and_lookup_round_trip_with_validators(tmp_path, clock):
+    cache = HTTPCache(str(tmp_path / "http.sqlite3"), freshness=60)
+    cache.store("page", "<p>Built with Streamlit • 2d</p>", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    entry = cache.lookup("page")
+    assert entry.body == "<p>Built with Streamlit • 2d</p>"
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"',
+                                                "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.conditional_headers(None) == {}
+    assert cache.lookup("missing") is None
+
+
+def test_entries_go_stale_after_freshness_and_a_304_renews_them(tmp_path, clock):
+    cache = HTTPCache(str(tmp_path / "http.sqlite3"), freshness=60)
+    cache.store("page", "body", etag='"v1"')
+
+    clock.now += 61
+    entry = cache.lookup("page")
+    assert not cache.is_fresh(entry)
+
+    cache.record_not_modified("page", entry)
+    assert cache.is_fresh(cache.lookup("page"))
+    assert cache.stats()["revalidated"] == 1
+    assert cache.stats()["bytes_saved"] == len("body")
+
+
+def test_least_recently_used_bodies_are_evicted_over_max_bytes(tmp_path, clock):
+    cache = HTTPCache(str(tmp_path / "http.sqlite3"))
+    for name in ("a", "b"):
+        cache.store(name, f"<html>{name * 2000}</html>")
+        clock.now += 1
+    entry_size = cache.stats()["stored_bytes"] // 2
+    cache.max_bytes = 2 * entry_size + entry_size // 2  # Room for two entries, not three
+
+    cache.lookup("a")  # Now more recently used than "b"
+    clock.now += 1
+    cache.store("c", f"<html>{'c' * 2000}</html>")
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") is not None and cache.lookup("c") is not None
+    assert cache.stats()["entries"] == 2
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Serves one page with a fixed ETag, answering 304 when the client already has it."""
+
+    def do_GET(self):
+        self.server.seen.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = self.server.body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    server = HTTPServer(("127.0.0.1", 0), ETagHandler)
+    server.etag = '"v1"'
+    server.body = "<html>first version</html>"
+    server.seen = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_scraper_revalidates_stale_pages_with_a_conditional_get(tmp_path, clock, etag_server):
+    url = f"http://127.0.0.1:{etag_server.server_address[1]}/posts/a"
+    scraper = LinkedInScraper(http_cache=HTTPCache(str(tmp_path / "http.sqlite3"), freshness=60))
+    scraper.throttle = HostThrottle(min_interval=0.0, jitter=0.0)
+
+    assert scraper._fetch_text(url) == "<html>first version</html>"
+    # Fresh: served from disk without a request
+    assert scraper._fetch_text(url) == "<html>first version</html>"
+    assert etag_server.seen == [None]
+
+    # Stale: revalidated, the server answers 304 and the cached body is reused
+    clock.now += 61
+    assert scraper._fetch_text(url) == "<html>first version</html>"
+    assert etag_server.seen == [None, '"v1"']
+
+    # Changed on the server: the new body replaces the cached one
+    clock.now += 61
+    etag_server.etag, etag_server.body = '"v2"', "<html>second version</html>"
+    assert scraper._fetch_text(url) == "<html>second version</html>"
+    assert scraper.http_cache.lookup(url).etag == '"v2"'
+
+    stats = scraper.http_cache.stats()
+    assert (stats["hits"], stats["revalidated"], stats["misses"]) == (1, 1, 2)
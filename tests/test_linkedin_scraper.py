@@ -0,0 +1,189 @@
+"""LinkedInScraper against a local HTTP server serving the saved post pages
+and a fake search API."""
+import gzip
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import config
+import linkedin_scraper
+from linkedin_scraper import HostThrottle, LinkedInScraper
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "benchmarks", "fixtures", "pages")
+RESULTS_PER_PAGE = 10
+
+
+def load_page(name: str) -> str:
+    with gzip.open(os.path.join(PAGES_DIR, f"{name}.html.gz"), "rt", encoding="utf-8") as handle:
+        return handle.read()
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Serves /posts/<page> from the saved pages and /search.json as a paged fake SerpAPI."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.pages = {name: load_page(name) for name in ("post_1", "post_2", "post_3")}
+        self.search_links = []  # Links returned by the search API, paged RESULTS_PER_PAGE at a time
+        self.requests = []  # (path, params, arrival time)
+        self.lock = threading.Lock()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.requests.append((url.path, params, time.monotonic()))
+
+        if url.path == "/search.json":
+            start = int(params.get("start", 0))
+            links = self.server.search_links[start:start + RESULTS_PER_PAGE]
+            body = json.dumps({"organic_results": [
+                {"link": link, "snippet": f"snippet {start + n}", "date": "1 day ago"}
+                for n, link in enumerate(links)
+            ]})
+            self._send(200, "application/json; charset=utf-8", body)
+        elif url.path.startswith("/posts/") and url.path[len("/posts/"):] in self.server.pages:
+            self._send(200, "text/html; charset=utf-8", self.server.pages[url.path[len("/posts/"):]])
+        else:
+            self._send(404, "text/plain", "not found")
+
+    def _send(self, status: int, content_type: str, body: str):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = FixtureServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_scraper(server, monkeypatch):
+    monkeypatch.setattr(linkedin_scraper, "SEARCH_API_URL", f"{server.base_url}/search.json")
+    monkeypatch.setattr(linkedin_scraper, "HTTP_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "SERPAPI_API_KEY", "test-key", raising=False)
+
+    def make(**kwargs) -> LinkedInScraper:
+        scraper = LinkedInScraper(**kwargs)
+        scraper.throttle = HostThrottle(max_concurrency=4, min_interval=0.0, jitter=0.0)
+        return scraper
+
+    return make
+
+
+def test_search_posts_dedups_and_keeps_only_post_links(server, make_scraper):
+    post = f"{server.base_url}/posts/"
+    server.search_links = [post + "a", f"{server.base_url}/in/someone", post + "b", post + "a", post + "c"]
+
+    posts = make_scraper(max_posts=20).search_posts("streamlit app", "#buildinpublic")
+
+    assert [p["url"] for p in posts] == [post + "a", post + "b", post + "c"]
+    assert posts[1] == {"url": post + "b", "snippet": "snippet 2", "date": "1 day ago"}
+    query = server.requests[0][1]
+    assert query["q"] == 'site:linkedin.com/posts "streamlit app" #buildinpublic'
+    assert query["api_key"] == "test-key"
+
+
+def test_search_posts_stops_at_max_posts(server, make_scraper):
+    server.search_links = [f"{server.base_url}/posts/{n}" for n in range(35)]
+
+    posts = make_scraper(max_posts=15).search_posts("streamlit")
+
+    assert [p["url"] for p in posts] == server.search_links[:15]
+    # Two pages of RESULTS_PER_PAGE cover 15 posts, the third is never requested
+    assert [params["start"] for path, params, _ in server.requests] == ["0", "10"]
+
+
+def test_search_posts_requires_api_key(make_scraper, monkeypatch):
+    monkeypatch.setattr(config, "SERPAPI_API_KEY", None, raising=False)
+    with pytest.raises(ValueError):
+        make_scraper().search_posts("streamlit")
+
+
+def test_extract_post_data_parses_post_page(server, make_scraper):
+    url = f"{server.base_url}/posts/post_1"
+
+    post_data = make_scraper().extract_post_data({"url": url, "snippet": "snippet", "date": "1 day ago"})
+
+    assert post_data["post_text"].startswith("Just launched our analytics dashboard built with Streamlit!")
+    assert post_data["post_url"] == url
+    assert post_data["post_author"] == "Jane Doe"
+    assert post_data["post_date"] == "2d"
+    assert post_data["post_reactions"] == 1204
+
+
+def test_extract_post_data_falls_back_to_snippet(server, make_scraper):
+    url = f"{server.base_url}/posts/deleted"
+
+    post_data = make_scraper().extract_post_data({"url": url, "snippet": "Built with Gradio", "date": "3 days ago"})
+
+    assert post_data == {
+        "post_text": "Built with Gradio",
+        "post_url": url,
+        "post_date": "3 days ago",
+        "post_author": "",
+        "post_reactions": None,
+    }
+
+
+def test_fetch_posts_spaces_requests_to_the_same_host(server, make_scraper):
+    scraper = make_scraper()
+    scraper.throttle = HostThrottle(max_concurrency=4, min_interval=0.15, jitter=0.0)
+    urls = [f"{server.base_url}/posts/post_{n % 3 + 1}" for n in range(5)]
+
+    posts = scraper.fetch_posts(urls)
+
+    assert [post["url"] for post in posts] == urls
+    arrivals = sorted(arrival for _, _, arrival in server.requests)
+    gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+    # Starts are spaced on the client, arrival times add some network jitter
+    assert arrivals[-1] - arrivals[0] >= 4 * 0.15 - 0.03
+    assert min(gaps) >= 0.1
+
+
+def test_host_throttle_caps_concurrency_per_host():
+    throttle = HostThrottle(max_concurrency=2, min_interval=0.0, jitter=0.0)
+    active = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    lock = threading.Lock()
+
+    def request(host: str):
+        with throttle.slot(host):
+            with lock:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+            time.sleep(0.05)
+            with lock:
+                active[host] -= 1
+
+    threads = [threading.Thread(target=request, args=(host,)) for host in "ab" * 5]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each host is capped on its own, one busy host does not hold up the other
+    assert peak == {"a": 2, "b": 2}
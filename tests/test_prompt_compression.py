@@ -0,0 +1,64 @@
+"""Post normalization and keyword-preserving truncation before prompting."""
+from prompt_compression import (ELLIPSIS, collapse_hashtags, compress_post, estimate_tokens, normalize,
+                                strip_tracking, truncate)
+
+FILLER = "We spent a lot of time talking to people about what they would want from it. " * 30
+OPENING = "Just launched our invoicing dashboard built with Streamlit for small agencies."
+CLOSING = "Thanks to everyone who tested it, feedback welcome!"
+
+
+def test_strip_tracking_keeps_real_params_and_trailing_punctuation():
+    assert strip_tracking("https://x.io/app?utm_source=li&id=3&trk=feed&fbclid=abc.") == "https://x.io/app?id=3."
+    assert strip_tracking("https://x.io/app?utm_medium=social") == "https://x.io/app"
+    assert strip_tracking("https://x.io/app") == "https://x.io/app"
+
+
+def test_collapse_hashtags_keeps_the_first_few_and_every_tech_tag():
+    text = "#buildinpublic #startup #saas #founders #python #growth #flask\nfollow along"
+    # The trailing space is cleaned up by normalize
+    assert collapse_hashtags(text, keep=3) == "#buildinpublic #startup #saas #python #flask \nfollow along"
+    # Short runs are left alone
+    assert collapse_hashtags("#startup #saas done", keep=1) == "#startup #saas done"
+
+
+def test_normalize_drops_emoji_and_extra_blank_lines():
+    text = "Shipped it 🚀🔥‍  today!\n\n\n\nLink:   https://x.io/?utm_campaign=launch  "
+    assert normalize(text) == "Shipped it today!\n\nLink: https://x.io/"
+
+
+def test_text_within_budget_is_unchanged():
+    text = f"{OPENING} {CLOSING}"
+    assert truncate(text, max_tokens=100) == text
+
+
+def test_truncate_keeps_head_tail_and_keyword_sentences_within_budget():
+    text = f"{OPENING} {FILLER}Next we need payment integration before the paid plan. {FILLER}{CLOSING}"
+
+    compressed = truncate(text, max_tokens=100)
+
+    assert estimate_tokens(compressed) <= 100
+    assert compressed.startswith(OPENING)
+    assert compressed.endswith(CLOSING)
+    assert f"{ELLIPSIS}Next we need payment integration before the paid plan.{ELLIPSIS}" in compressed
+    assert "Also mentions" not in compressed
+
+
+def test_keywords_that_do_not_fit_are_listed_at_the_end():
+    too_long = "The admin area " + "really " * 200 + "needs user roles and a database before we open it up."
+    text = f"Built with Flask. {FILLER}{too_long} {FILLER}Thanks!"
+
+    compressed = truncate(text, max_tokens=100)
+
+    assert "really really" not in compressed
+    assert compressed.endswith("\nAlso mentions: database, user roles")
+    assert estimate_tokens(compressed) <= 100
+
+
+def test_compress_post_normalizes_before_truncating():
+    text = f"{OPENING} 🚀 https://x.io/?utm_source=li {FILLER}{CLOSING}"
+
+    compressed = compress_post(text, max_tokens=60)
+
+    assert "utm_source" not in compressed and "🚀" not in compressed
+    assert compressed.startswith(f"{OPENING} https://x.io/")
+    assert estimate_tokens(compressed) <= 60
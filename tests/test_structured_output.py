@@ -0,0 +1,93 @@
+"""Tolerant decoding and coercion of Gemini analysis responses."""
+import pytest
+
+import structured_output
+from config import DEFAULT_ANALYSIS
+from structured_output import ANALYSIS_SCHEMA, BATCH_ANALYSIS_SCHEMA, coerce_analysis, decode_response
+
+
+@pytest.fixture(params=["orjson", "json"])
+def decoder(request, monkeypatch):
+    """Run a test with orjson (when installed) and with the standard library fallback."""
+    if request.param == "orjson":
+        if structured_output.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(structured_output, "orjson", None)
+    return request.param
+
+
+@pytest.mark.parametrize("text", [
+    '{"lead_score": 7}',
+    '```json\n{"lead_score": 7}\n```',
+    '```\n{"lead_score": 7}\n```',
+    'Here is the analysis:\n{"lead_score": 7}\nLet me know if you need more.',
+])
+def test_decode_response_recovers_the_object(decoder, text):
+    assert decode_response(text) == {"lead_score": 7}
+
+
+def test_decode_response_recovers_a_batched_array_from_prose(decoder):
+    text = 'Sure! [{"index": 0, "lead_score": 3}, {"index": 1, "lead_score": 8}] Hope this helps.'
+    assert decode_response(text) == [{"index": 0, "lead_score": 3}, {"index": 1, "lead_score": 8}]
+
+
+@pytest.mark.parametrize("text", [
+    "I could not analyze this post.",
+    '{"lead_score": 7, "tech_stack": ["stream',  # Cut off mid-response
+    "} nothing useful {",
+])
+def test_decode_response_raises_value_error_when_nothing_is_recoverable(decoder, text):
+    with pytest.raises(ValueError):
+        decode_response(text)
+
+
+def test_coerce_fills_missing_keys_with_defaults():
+    assert coerce_analysis({"lead_score": 5}) == {**DEFAULT_ANALYSIS, "lead_score": 5.0}
+
+
+def test_coerce_accepts_loosely_typed_fields():
+    analysis = coerce_analysis({
+        "tech_stack": "Streamlit, Python ,",
+        "missing_features": ["login", None, " ", 3],
+        "potential_needs": None,
+        "project_stage": " MVP ",
+        "lead_score": "7.5",
+        "confidence": "high",
+    })
+
+    assert analysis == {
+        "tech_stack": ["Streamlit", "Python"],
+        "missing_features": ["login", "3"],
+        "potential_needs": [],
+        "project_stage": "mvp",
+        "lead_score": 7.5,
+        "confidence": "high",  # Extra keys are kept
+    }
+
+
+@pytest.mark.parametrize("score, expected", [(14, 10.0), (-2, 0.0), ("3", 3.0)])
+def test_coerce_clamps_lead_score(score, expected):
+    assert coerce_analysis({"lead_score": score})["lead_score"] == expected
+
+
+def test_coerce_maps_unknown_stages_to_unknown():
+    assert coerce_analysis({"project_stage": "series A"})["project_stage"] == "unknown"
+    assert coerce_analysis({"project_stage": None})["project_stage"] == "unknown"
+
+
+@pytest.mark.parametrize("value", [
+    ["not", "an", "object"],
+    "mvp",
+    {"lead_score": "very high"},
+    {"lead_score": float("nan")},
+    {"tech_stack": {"streamlit": True}},
+])
+def test_coerce_rejects_values_that_are_not_analyses(value):
+    assert coerce_analysis(value) is None
+
+
+def test_schemas_require_every_analysis_field():
+    assert set(ANALYSIS_SCHEMA["required"]) == set(DEFAULT_ANALYSIS)
+    assert ANALYSIS_SCHEMA["properties"]["project_stage"]["enum"][-1] == "unknown"
+    assert BATCH_ANALYSIS_SCHEMA["items"]["required"][0] == "index"